@@ -1,7 +1,14 @@
+import os
+import sys
+
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from relatorios import agregacoes
+from relatorios.validacao import avisar_quarentena, carregar_dados_validados
+
 class MediaVendasPorMarca:
     """
     Classe responsável por calcular e visualizar a média ponderada de vendas por marca.
@@ -9,6 +16,7 @@ class MediaVendasPorMarca:
     Attributes:
         file_path (str): Caminho do arquivo CSV contendo os dados.
         df (pd.DataFrame): DataFrame para armazenar os dados carregados.
+        codificados (DadosCodificados): Os dados com as chaves de agrupamento já codificadas.
 
     Methods:
         carregar_dados: Carrega os dados do arquivo CSV. Exibe uma mensagem de erro se o arquivo não for encontrado.
@@ -25,13 +33,17 @@ class MediaVendasPorMarca:
         """
         self.file_path = file_path
         self.df = None
+        self.codificados = None
 
     def carregar_dados(self) -> None:
         """
-        Carrega os dados do arquivo CSV. Exibe uma mensagem de erro se o arquivo não for encontrado.
+        Carrega e valida os dados do arquivo CSV, enviando linhas inválidas para a quarentena.
+        Exibe uma mensagem de erro se o arquivo não for encontrado.
         """
         try:
-            self.df = pd.read_csv(self.file_path)
+            self.df = carregar_dados_validados(self.file_path)
+            avisar_quarentena(self.df.attrs)
+            self.codificados = agregacoes.codificar(self.df)
         except FileNotFoundError:
             print(f'O arquivo {self.file_path} não foi encontrado. Verifique o caminho.')
 
@@ -42,11 +54,7 @@ class MediaVendasPorMarca:
         Returns:
             pd.DataFrame: DataFrame contendo as marcas e suas respectivas médias ponderadas de vendas.
         """
-        self.df['Vendas_Ponderadas'] = self.df['vendas'] * self.df.groupby('marca')['vendas'].transform('mean')
-        media_vendas_por_marca = self.df.groupby('marca')['Vendas_Ponderadas'].sum() / self.df.groupby('marca')['vendas'].sum()
-        media_vendas_por_marca = media_vendas_por_marca.reset_index()
-        media_vendas_por_marca.columns = ['marca', 'Media_Vendas']
-        return media_vendas_por_marca
+        return agregacoes.media_ponderada_por_marca(self.codificados)
 
     def criar_grafico(self) -> None:
         """
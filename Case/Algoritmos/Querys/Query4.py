@@ -1,7 +1,13 @@
-import pandas as pd
+import os
+import sys
+
 import matplotlib.pyplot as plt
-from pandas.plotting import table
-import seaborn as sns
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from relatorios import agregacoes
+from relatorios.cache_renderizacao import CacheRenderizacao
+from relatorios.exportacao import exportar_tabela
+from relatorios.validacao import avisar_quarentena, carregar_dados_validados
 
 class AnaliseVendasPorMarca:
     """
@@ -10,13 +16,13 @@ class AnaliseVendasPorMarca:
     Attributes:
         caminho_arquivo (str): Caminho do arquivo CSV contendo os dados.
         df (pd.DataFrame): DataFrame para armazenar os dados carregados.
+        codificados (DadosCodificados): Os dados com as chaves de agrupamento já codificadas.
 
     Methods:
-        carregar_dados: Carrega os dados do arquivo CSV.
-        limpar_nomes_marcas: Remove espaços extras nos nomes das marcas.
+        carregar_dados: Carrega e valida os dados do arquivo CSV, já com os nomes das marcas normalizados.
         calcular_receita_e_vendas: Calcula a receita total e o número total de vendas por marca.
         criar_grafico_dispersao: Cria um gráfico de dispersão destacando marcas com maior receita e menor número de vendas.
-        criar_tabela_resumo: Cria uma tabela de resumo ordenada pela receita gerada por marca.
+        criar_tabela_resumo: Cria uma tabela de resumo ordenada pela receita gerada por marca e a exporta.
     """
 
     def __init__(self, caminho_arquivo: str):
@@ -28,25 +34,24 @@ class AnaliseVendasPorMarca:
         """
         self.caminho_arquivo = caminho_arquivo
         self.df = None
+        self.codificados = None
 
     def carregar_dados(self) -> None:
         """
-        Carrega os dados do arquivo CSV.
-        """
-        self.df = pd.read_csv(self.caminho_arquivo)
-
-    def limpar_nomes_marcas(self) -> None:
-        """
-        Remove espaços extras nos nomes das marcas.
+        Carrega e valida os dados do arquivo CSV. Os nomes das marcas já chegam sem espaços
+        extras e as linhas inválidas são enviadas para a quarentena.
         """
-        self.df['marca'] = self.df['marca'].str.strip()
+        self.df = carregar_dados_validados(self.caminho_arquivo)
+        avisar_quarentena(self.df.attrs)
+        self.codificados = agregacoes.codificar(self.df)
 
     def calcular_receita_e_vendas(self) -> None:
         """
         Calcula a receita total e o número total de vendas por marca.
         """
-        receita_por_marca = self.df.groupby('marca')['valor_do_veiculo'].sum().sort_values(ascending=False)
-        vendas_por_marca = self.df.groupby('marca')['vendas'].sum()
+        resumo = agregacoes.resumo_por_marca(self.codificados).set_index('Marca').rename_axis('marca')
+        receita_por_marca = resumo['Receita Gerada']
+        vendas_por_marca = resumo['Número de Vendas']
         marcas_destacadas = receita_por_marca[receita_por_marca / vendas_por_marca < receita_por_marca.mean() / vendas_por_marca.mean()]
         self.df = self.df.set_index('marca').loc[receita_por_marca.index].reset_index()
 
@@ -76,35 +81,23 @@ class AnaliseVendasPorMarca:
         # Exibindo o gráfico
         plt.show()
 
-    def criar_tabela_resumo(self) -> None:
+    def criar_tabela_resumo(self, caminho_saida: str = 'tabela_resumo.png') -> None:
         """
-        Cria uma tabela de resumo ordenada pela receita gerada por marca e a exibe como uma imagem PNG.
+        Cria uma tabela de resumo ordenada pela receita gerada por marca e a exporta.
+
+        Por padrão a tabela é exibida como uma imagem PNG; outras extensões (.csv, .jsonl,
+        .parquet, .html) gravam a mesma tabela nos formatos tabulares.
+
+        Args:
+            caminho_saida (str): Caminho do arquivo de saída.
         """
-        tabela_resumo = pd.DataFrame({
-            'Marca': self.df.groupby('marca')['vendas'].sum().index,
-            'Número de Vendas': self.df.groupby('marca')['vendas'].sum().values,
-            'Receita Gerada': self.df.groupby('marca')['valor_do_veiculo'].sum().values
-        })
-
-        tabela_resumo = tabela_resumo.sort_values(by='Receita Gerada', ascending=False)
-
-        # Plotando a tabela como uma imagem com estilo moderno e paleta de cinza
-        fig, ax = plt.subplots(figsize=(8, 3))
-        ax.set_frame_on(False)
-        ax.xaxis.set_visible(False)
-        ax.yaxis.set_visible(False)
-
-        # Utilizando o estilo de fundo do seaborn
-        sns.set_style("whitegrid")
-
-        tabla = table(ax, tabela_resumo, loc='center', colWidths=[0.15]*len(tabela_resumo.columns), cellLoc='center', colColours=['#f2f2f2']*len(tabela_resumo.columns))
-        tabla.auto_set_font_size(False)
-        tabla.set_fontsize(8)
-        tabla.scale(1.2, 1.2)
-
-        # Salvando a imagem como um arquivo PNG
-        plt.savefig('tabela_resumo.png', bbox_inches='tight', pad_inches=0.05, transparent=True)
-        plt.show()
+        tabela_resumo = agregacoes.resumo_por_marca(self.codificados)
+
+        exibir = caminho_saida.lower().endswith('.png')
+        exportar_tabela(tabela_resumo, caminho_saida, titulo='Resumo de Vendas por Marca',
+                        formatadores={'Receita Gerada': '{:,.2f}'}, cache=CacheRenderizacao() if exibir else None)
+        if exibir:
+            plt.show()
 
 def main():
     """
@@ -113,7 +106,6 @@ def main():
     caminho_arquivo = r'C:\Users\Ana Brandão\Desktop\Case\Dataset\dados_cleaned.csv'
     analise_vendas = AnaliseVendasPorMarca(caminho_arquivo)
     analise_vendas.carregar_dados()
-    analise_vendas.limpar_nomes_marcas()
     analise_vendas.calcular_receita_e_vendas()
     analise_vendas.criar_tabela_resumo()
 
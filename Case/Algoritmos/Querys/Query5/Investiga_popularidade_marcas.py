@@ -2,12 +2,17 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import sys
 import calendar
-from pandas.plotting import table
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from relatorios.cache_renderizacao import CacheRenderizacao, exibir_imagem
+from relatorios.exportacao import exportar_tabela
+from relatorios.validacao import avisar_quarentena, carregar_dados_validados
 
 def carregar_dados(caminho_arquivo):
     """
-    Carrega dados a partir de um arquivo CSV.
+    Carrega e valida dados a partir de um arquivo CSV. Linhas inválidas são enviadas para a quarentena.
 
     Parameters:
     - caminho_arquivo (str): O caminho do arquivo CSV.
@@ -15,7 +20,9 @@ def carregar_dados(caminho_arquivo):
     Returns:
     - pd.DataFrame: O DataFrame contendo os dados carregados.
     """
-    return pd.read_csv(caminho_arquivo)
+    dados = carregar_dados_validados(caminho_arquivo)
+    avisar_quarentena(dados.attrs)
+    return dados
 
 def criar_grafico_correlacao_popularidade_valor_marca_temporal(dados, salvar_grafico=False):
     """
@@ -23,7 +30,8 @@ def criar_grafico_correlacao_popularidade_valor_marca_temporal(dados, salvar_gra
 
     Parameters:
     - dados (pd.DataFrame): O DataFrame contendo os dados.
-    - salvar_grafico (bool): Indica se o gráfico deve ser salvo como imagem PNG.
+    - salvar_grafico (bool): Indica se o gráfico deve ser salvo como imagem PNG. A imagem é reaproveitada
+      do cache (e apenas exibida) se a série por marca e mês não mudou desde a última execução.
 
     Returns:
     - None
@@ -37,6 +45,33 @@ def criar_grafico_correlacao_popularidade_valor_marca_temporal(dados, salvar_gra
     dados_agrupados = dados.groupby(['marca', 'mes'])[['vendas', 'valor_do_veiculo']].sum().reset_index()
     dados_agrupados['valor_medio'] = dados_agrupados['valor_do_veiculo'] / dados_agrupados['vendas']
 
+    if not salvar_grafico:
+        desenhar_grafico_correlacao(dados_agrupados)
+        plt.show()
+        return
+
+    especificacao = {'tipo': 'linhas', 'paleta': 'magma', 'figsize': (14, 6),
+                     'titulo': 'Correlação entre Popularidade de Marca e Valor Médio Mensal por Marca'}
+    reaproveitado = CacheRenderizacao().obter_ou_renderizar(
+        dados_agrupados, especificacao, lambda caminho: desenhar_grafico_correlacao(dados_agrupados, caminho),
+        'correlacao_popularidade_valor_marca.png')
+    if reaproveitado:
+        print('correlacao_popularidade_valor_marca.png reaproveitado do cache.')
+        exibir_imagem('correlacao_popularidade_valor_marca.png', especificacao['figsize'])
+
+    plt.show()
+
+def desenhar_grafico_correlacao(dados_agrupados, caminho=None):
+    """
+    Desenha o gráfico de linha do valor médio mensal por marca.
+
+    Parameters:
+    - dados_agrupados (pd.DataFrame): Vendas e valor médio por marca e mês.
+    - caminho (str): Caminho da imagem PNG. Se omitido, o gráfico não é salvo.
+
+    Returns:
+    - None
+    """
     plt.figure(figsize=(14, 6))
     sns.lineplot(x='mes', y='valor_medio', hue='marca', data=dados_agrupados, marker='o', palette='magma')
     plt.title('Correlação entre Popularidade de Marca e Valor Médio Mensal por Marca')
@@ -46,12 +81,8 @@ def criar_grafico_correlacao_popularidade_valor_marca_temporal(dados, salvar_gra
     plt.legend(title='Marca', bbox_to_anchor=(1.05, 1), loc='upper left')
     plt.tight_layout()
 
-    print(f"Impressão do arquivo: {os.path.abspath(os.path.realpath(caminho_arquivo))}")
-
-    if salvar_grafico:
-        plt.savefig('correlacao_popularidade_valor_marca.png')
-
-    plt.show()
+    if caminho:
+        plt.savefig(caminho)
 
 def calcular_preco_medio_por_marca(dados):
     """
@@ -67,23 +98,18 @@ def calcular_preco_medio_por_marca(dados):
     dados_agrupados['preco_medio'] = dados_agrupados['valor_do_veiculo'].map('R${:,.2f}'.format)
     return dados_agrupados
 
-# Caminho do arquivo CSV
-caminho_arquivo = r'C:\Users\Ana Brandão\Desktop\Case\Dataset\dados_cleaned.csv'
-dados = carregar_dados(caminho_arquivo)
-
-# Calcular o preço médio por marca
-tabela_preco_medio = calcular_preco_medio_por_marca(dados)
-
-# Salvar a tabela como uma imagem PNG
-fig, ax = plt.subplots(figsize=(8, 3)) 
-ax.axis('off')
-tbl = table(ax, tabela_preco_medio, loc='center', colWidths=[0.2]*len(tabela_preco_medio.columns))
-tbl.auto_set_font_size(False)
-tbl.set_fontsize(10)
-tbl.auto_set_column_width(col=list(range(len(tabela_preco_medio.columns))))
-plt.savefig('tabela_preco_medio.png', bbox_inches='tight', pad_inches=0.05)
-print("Tabela de preço médio salva como tabela_preco_medio.png")
-plt.show()
-
-# Cria e exibe o gráfico, e opcionalmente, salva como PNG
-criar_grafico_correlacao_popularidade_valor_marca_temporal(dados, salvar_grafico=True)
+if __name__ == "__main__":
+    # Caminho do arquivo CSV
+    caminho_arquivo = r'C:\Users\Ana Brandão\Desktop\Case\Dataset\dados_cleaned.csv'
+    dados = carregar_dados(caminho_arquivo)
+
+    # Calcular o preço médio por marca
+    tabela_preco_medio = calcular_preco_medio_por_marca(dados)
+
+    # Salvar a tabela como uma imagem PNG
+    exportar_tabela(tabela_preco_medio, 'tabela_preco_medio.png', cache=CacheRenderizacao())
+    print("Tabela de preço médio salva como tabela_preco_medio.png")
+    plt.show()
+
+    # Cria e exibe o gráfico, e opcionalmente, salva como PNG
+    criar_grafico_correlacao_popularidade_valor_marca_temporal(dados, salvar_grafico=True)
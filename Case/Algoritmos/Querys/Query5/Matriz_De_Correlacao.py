@@ -1,7 +1,12 @@
-import pandas as pd
+import os
+import sys
+
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from relatorios.validacao import avisar_quarentena, carregar_dados_validados
+
 class MatrizCorrelacaoPlotter:
     def __init__(self, caminho_arquivo: str, colunas_interesse: list):
         """
@@ -16,12 +21,15 @@ class MatrizCorrelacaoPlotter:
 
     def carregar_dados(self):
         """
-        Carrega os dados do arquivo CSV e retorna o DataFrame correspondente.
+        Carrega e valida os dados do arquivo CSV e retorna o DataFrame correspondente.
+        Linhas inválidas são enviadas para a quarentena.
 
         Returns:
             pd.DataFrame: DataFrame carregado a partir do arquivo CSV.
         """
-        return pd.read_csv(self.caminho_arquivo)
+        dados = carregar_dados_validados(self.caminho_arquivo)
+        avisar_quarentena(dados.attrs)
+        return dados
 
     def calcular_matriz_correlacao(self, dados):
         """
@@ -64,12 +72,13 @@ class MatrizCorrelacaoPlotter:
         correlation_matrix = self.calcular_matriz_correlacao(dados)
         self.plotar_matriz_correlacao(correlation_matrix)
 
-# Exemplo de uso
-caminho_arquivo = "Dataset/dados_cleaned.csv"
-colunas_interesse = ['vendas', 'valor_do_veiculo']
+if __name__ == "__main__":
+    # Exemplo de uso
+    caminho_arquivo = "Dataset/dados_cleaned.csv"
+    colunas_interesse = ['vendas', 'valor_do_veiculo']
 
-# Criando uma instância do MatrizCorrelacaoPlotter
-plotter = MatrizCorrelacaoPlotter(caminho_arquivo, colunas_interesse)
+    # Criando uma instância do MatrizCorrelacaoPlotter
+    plotter = MatrizCorrelacaoPlotter(caminho_arquivo, colunas_interesse)
 
-# Executando o processo completo
-plotter.executar()
+    # Executando o processo completo
+    plotter.executar()
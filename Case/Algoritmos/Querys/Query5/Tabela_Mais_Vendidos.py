@@ -1,7 +1,14 @@
-import pandas as pd
+import os
+import sys
+
 import matplotlib.pyplot as plt
 import seaborn as sns
-from pandas.plotting import table
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from relatorios import agregacoes
+from relatorios.cache_renderizacao import CacheRenderizacao
+from relatorios.exportacao import exportar_tabela, renderizar_tabela_png
+from relatorios.validacao import avisar_quarentena, carregar_dados_validados
 
 class TabelaTop10Veiculos:
     """
@@ -12,16 +19,17 @@ class TabelaTop10Veiculos:
 
     Attributes:
         dados (pd.DataFrame): DataFrame contendo os dados dos veículos.
-        fig (matplotlib.figure.Figure): A figura matplotlib que contém a tabela.
-        ax (matplotlib.axes._axes.Axes): Os eixos matplotlib nos quais a tabela é desenhada.
-        table (matplotlib.table.Table): A tabela matplotlib que exibe os dados.
+        codificados (DadosCodificados): Os dados com as chaves de agrupamento já codificadas.
+        tabela (pd.DataFrame): Tabela dos top 10 veículos, já com a coluna de índice.
+        fig (matplotlib.figure.Figure): A figura matplotlib que contém a tabela, após salvar_como_imagem
+            (a imagem do cache, se ela foi reaproveitada).
 
     Methods:
-        _criar_tabela: Cria a tabela matplotlib.
+        _criar_tabela: Cria a tabela dos top 10 veículos.
         _obter_top_10_veiculos: Obtém os top 10 veículos com base nas vendas totais.
-        _formatar_dados_tabela: Formata os dados para a tabela matplotlib.
-        _estilizar_tabela: Estiliza a tabela matplotlib.
+        _formatar_dados_tabela: Adiciona a coluna de índice à tabela.
         salvar_como_imagem: Salva a tabela como uma imagem PNG.
+        exportar: Exporta a tabela em CSV, JSONL, Parquet ou HTML.
         exibir_tabela: Exibe a tabela (opcional).
     """
 
@@ -33,27 +41,16 @@ class TabelaTop10Veiculos:
             dados (pd.DataFrame): DataFrame contendo os dados dos veículos.
         """
         self.dados = dados
+        self.codificados = agregacoes.codificar(dados)
+        self.fig = None
         self._criar_tabela()
 
     def _criar_tabela(self):
         """
-        Cria a tabela matplotlib.
+        Cria a tabela dos top 10 veículos.
         """
         tabela_top_10_veiculos = self._obter_top_10_veiculos()
-
-        # Criar tabela matplotlib
-        self.fig, self.ax = plt.subplots(figsize=(16, 8))
-        self.ax.axis('off')
-
-        table_data = self._formatar_dados_tabela(tabela_top_10_veiculos)
-
-        self.table = self.ax.table(cellText=table_data, colLabels=tabela_top_10_veiculos.columns,
-                                   cellLoc='center', loc='center', bbox=[0, 0, 1, 1])
-
-        self._estilizar_tabela()
-
-        # Adicionar borda à tabela
-        self.ax.add_table(self.table)
+        self.tabela = self._formatar_dados_tabela(tabela_top_10_veiculos)
 
     def _obter_top_10_veiculos(self):
         """
@@ -62,58 +59,40 @@ class TabelaTop10Veiculos:
         Returns:
             pd.DataFrame: DataFrame com os top 10 veículos e suas vendas totais.
         """
-        vendas_por_veiculo = self.dados.groupby('nome')['vendas'].sum()
-        tabela_top_10_veiculos = pd.DataFrame({'Veículo': vendas_por_veiculo.index, 'Vendas Totais': vendas_por_veiculo.values})
-        tabela_top_10_veiculos = tabela_top_10_veiculos.sort_values(by='Vendas Totais', ascending=False).head(10)
-        tabela_top_10_veiculos.index = range(1, 11)
-        return tabela_top_10_veiculos
+        return agregacoes.top_veiculos(self.codificados, n=10)
 
     def _formatar_dados_tabela(self, tabela_top_10_veiculos):
         """
-        Formata os dados para a tabela matplotlib.
+        Adiciona a coluna de índice à tabela.
 
         Args:
             tabela_top_10_veiculos (pd.DataFrame): DataFrame com os top 10 veículos e suas vendas totais.
 
         Returns:
-            list: Lista de listas contendo os dados formatados para a tabela matplotlib.
+            pd.DataFrame: Tabela com a coluna 'Índice' de 1 a 10 na primeira posição.
         """
-        # Adicionar a coluna de índice de 1 a 10
-        tabela_top_10_veiculos.insert(0, 'Índice', range(1, 11))
-
-        # Função para formatar os dados para a tabela matplotlib
-        table_data = [list(row) for _, row in tabela_top_10_veiculos.iterrows()]
-        return table_data
+        tabela_top_10_veiculos.insert(0, 'Índice', range(1, len(tabela_top_10_veiculos) + 1))
+        return tabela_top_10_veiculos
 
-    def _estilizar_tabela(self):
+    def salvar_como_imagem(self, caminho):
         """
-        Estiliza a tabela matplotlib.
+        Salva a tabela como uma imagem PNG, com o cabeçalho e a coluna de índice destacados.
+        A imagem é reaproveitada do cache se a tabela não mudou desde a última execução.
+
+        Args:
+            caminho (str): O caminho do arquivo onde a imagem será salva.
         """
-        self.table.auto_set_font_size(False)
-        self.table.set_fontsize(12)
-        self.table.scale(1.2, 1.2)
-
-        colors = ['#F0F0F0', '#D9D9D9', '#C0C0C0']
-        for i, key in enumerate(self.table._cells):
-            cell = self.table._cells[key]
-            if i % 3 == 0:  # Destacar a primeira coluna
-                cell.set_facecolor('#606c88')  # Usar a cor da paleta cinza moderna
-                cell.set_text_props(color='white')
-            elif i // 1 == 0:  # Destacar a primeira linha
-                cell.set_facecolor('#606c88')  # Usar a cor da paleta cinza moderna
-                cell.set_text_props(color='white')
-            elif i > 30:  # Ignorar as três primeiras células (cabeçalho)
-                cell.set_facecolor('#606c88')  # Usar a cor da paleta cinza moderna
-                cell.set_text_props(color='white')
+        self.fig = renderizar_tabela_png(self.tabela, caminho, destacar_primeira_coluna=True,
+                                         tamanho_fonte=12, figsize=(16, 8), cache=CacheRenderizacao())
 
-    def salvar_como_imagem(self, caminho):
+    def exportar(self, caminho):
         """
-        Salva a tabela como uma imagem PNG.
+        Exporta a tabela em CSV, JSONL, Parquet ou HTML, conforme a extensão do arquivo.
 
         Args:
-            caminho (str): O caminho do arquivo onde a imagem será salva.
+            caminho (str): O caminho do arquivo de saída.
         """
-        self.fig.savefig(caminho, bbox_inches='tight', pad_inches=0.5, transparent=True)
+        exportar_tabela(self.tabela, caminho, titulo='Top 10 Veículos Mais Vendidos')
 
     def exibir_tabela(self):
         """
@@ -121,13 +100,15 @@ class TabelaTop10Veiculos:
         """
         plt.show()
 
-# Exemplo de uso
-caminho_arquivo = 'Dataset/dados_cleaned.csv'
-dados = pd.read_csv(caminho_arquivo)
+if __name__ == "__main__":
+    # Exemplo de uso
+    caminho_arquivo = 'Dataset/dados_cleaned.csv'
+    dados = carregar_dados_validados(caminho_arquivo)
+    avisar_quarentena(dados.attrs)
 
-# Configurar a paleta de cores cinza para seaborn
-sns.set_palette("Greys")
+    # Configurar a paleta de cores cinza para seaborn
+    sns.set_palette("Greys")
 
-tabela_top_10_veiculos = TabelaTop10Veiculos(dados)
-tabela_top_10_veiculos.salvar_como_imagem('Querys\\Query5\\tabela_top_10_veiculos.png')
-tabela_top_10_veiculos.exibir_tabela()
+    tabela_top_10_veiculos = TabelaTop10Veiculos(dados)
+    tabela_top_10_veiculos.salvar_como_imagem('Querys\\Query5\\tabela_top_10_veiculos.png')
+    tabela_top_10_veiculos.exibir_tabela()
@@ -1,13 +1,21 @@
-import pandas as pd
+import os
+import sys
+
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from relatorios import agregacoes
+from relatorios.cache_renderizacao import CacheRenderizacao, exibir_imagem
+from relatorios.validacao import avisar_quarentena, carregar_dados_validados
+
 class GraficoVendas:
     """
     Classe que representa um gráfico de barras horizontais mostrando o volume de vendas por marca.
 
     Attributes:
         dados (pd.DataFrame): DataFrame contendo os dados de vendas por marca.
+        codificados (DadosCodificados): Os dados com as chaves de agrupamento já codificadas.
 
     Methods:
         calcular_vendas_por_marca: Calcula o número total de vendas por marca.
@@ -19,9 +27,11 @@ class GraficoVendas:
         Inicializa a instância da classe.
 
         Args:
-            caminho_arquivo (str): O caminho do arquivo CSV contendo os dados.
+            caminho_arquivo (str): O caminho do arquivo CSV contendo os dados. Linhas inválidas são enviadas para a quarentena.
         """
-        self.dados = pd.read_csv(caminho_arquivo)
+        self.dados = carregar_dados_validados(caminho_arquivo)
+        avisar_quarentena(self.dados.attrs)
+        self.codificados = agregacoes.codificar(self.dados)
 
     def calcular_vendas_por_marca(self):
         """
@@ -30,17 +40,38 @@ class GraficoVendas:
         Returns:
             pd.DataFrame: DataFrame contendo as marcas e seus respectivos volumes de vendas, ordenados por volume.
         """
-        vendas_por_marca = self.dados.groupby('marca')['vendas'].sum().reset_index()
-        return vendas_por_marca.sort_values(by='vendas', ascending=False)
+        return agregacoes.vendas_por_marca(self.codificados)
 
     def plotar_grafico(self):
         """
         Plota o gráfico de barras horizontais mostrando o volume de vendas por marca.
-        Os resultados são salvos como uma imagem PNG chamada 'grafico_vendas.png'.
+        Os resultados são salvos como uma imagem PNG chamada 'grafico_vendas.png'; se as vendas
+        por marca não mudaram desde a última execução, a imagem é reaproveitada do cache e
+        exibida sem ser desenhada de novo.
         """
         # Calcular o número de vendas por marca
         vendas_por_marca = self.calcular_vendas_por_marca()
 
+        especificacao = {'tipo': 'barras_horizontais', 'paleta': 'viridis', 'figsize': (12, 8),
+                         'titulo': 'Volume de Vendas por Marca'}
+        reaproveitado = CacheRenderizacao().obter_ou_renderizar(
+            vendas_por_marca, especificacao,
+            lambda caminho: self._desenhar_grafico(vendas_por_marca, caminho), 'grafico_vendas.png')
+        if reaproveitado:
+            print('grafico_vendas.png reaproveitado do cache.')
+            exibir_imagem('grafico_vendas.png', especificacao['figsize'])
+
+        # Mostrar o gráfico
+        plt.show()
+
+    def _desenhar_grafico(self, vendas_por_marca, caminho):
+        """
+        Desenha o gráfico de barras horizontais e o salva em `caminho`.
+
+        Args:
+            vendas_por_marca (pd.DataFrame): Vendas por marca, ordenadas por volume.
+            caminho (str): Caminho da imagem PNG.
+        """
         # Definir a paleta de cores Viridis
         viridis_colors = sns.color_palette("viridis", len(vendas_por_marca))
 
@@ -61,10 +92,7 @@ class GraficoVendas:
 
         # Ajustar layout e salvar o gráfico
         plt.tight_layout()
-        plt.savefig('grafico_vendas.png')
-
-        # Mostrar o gráfico
-        plt.show()
+        plt.savefig(caminho)
 
 def main():
     """
@@ -1,6 +1,14 @@
+import os
+import sys
+
 import pandas as pd
 import matplotlib.pyplot as plt
-from matplotlib.colors import LinearSegmentedColormap
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from relatorios import agregacoes
+from relatorios.cache_renderizacao import CacheRenderizacao
+from relatorios.exportacao import LIMITE_LINHAS_PNG, exportar_tabela
+from relatorios.validacao import carregar_dados_validados
 
 class TabelaReceita:
     """
@@ -9,12 +17,13 @@ class TabelaReceita:
     Attributes:
         caminho_dados (str): Caminho do arquivo CSV contendo os dados.
         dados (pd.DataFrame): DataFrame para armazenar os dados carregados.
+        codificados (DadosCodificados): Os dados com as chaves de agrupamento já codificadas.
 
     Methods:
         carregar_dados: Tenta carregar os dados do arquivo CSV. Exibe uma mensagem de erro se o arquivo não for encontrado.
-        verificar_valores_nulos: Verifica a presença de valores nulos nos dados carregados.
+        verificar_valores_nulos: Informa se linhas com valores nulos ou inválidos foram enviadas para a quarentena.
         calcular_receita: Calcula a receita para cada veículo e a receita total.
-        criar_tabela: Cria um DataFrame com as informações de receita, formata e visualiza a tabela.
+        criar_tabela: Cria um DataFrame com as informações de receita e o exporta em PNG, CSV, JSONL, Parquet ou HTML.
     """
 
     def __init__(self, caminho_dados: str):
@@ -26,22 +35,28 @@ class TabelaReceita:
         """
         self.caminho_dados = caminho_dados
         self.dados = None
+        self.codificados = None
 
     def carregar_dados(self) -> None:
         """
-        Tenta carregar os dados do arquivo CSV. Exibe uma mensagem de erro se o arquivo não for encontrado.
+        Tenta carregar os dados do arquivo CSV, validando-os durante a leitura. Linhas inválidas
+        são enviadas para a quarentena. Exibe uma mensagem de erro se o arquivo não for encontrado.
         """
         try:
-            self.dados = pd.read_csv(self.caminho_dados)
+            self.dados = carregar_dados_validados(self.caminho_dados)
+            self.codificados = agregacoes.codificar(self.dados)
         except FileNotFoundError:
             print(f'O arquivo {self.caminho_dados} não foi encontrado. Verifique o caminho.')
 
     def verificar_valores_nulos(self) -> None:
         """
-        Verifica a presença de valores nulos nos dados carregados.
+        Informa se linhas com valores nulos ou inválidos foram enviadas para a quarentena.
+
+        A verificação é feita durante a carga, então aqui não há uma nova passada sobre os dados.
         """
-        if self.dados is not None and self.dados.isnull().any().any():
-            print('Existem valores nulos nos dados. Considere tratá-los antes de prosseguir.')
+        if self.dados is not None and self.dados.attrs.get('linhas_em_quarentena'):
+            print(f"Existem {self.dados.attrs['linhas_em_quarentena']} linhas com valores nulos ou inválidos; "
+                  f"elas foram ignoradas e estão em {self.dados.attrs['caminho_quarentena']}.")
 
     def calcular_receita(self) -> pd.DataFrame:
         """
@@ -50,61 +65,36 @@ class TabelaReceita:
         Returns:
             pd.DataFrame: DataFrame contendo o nome do veículo e sua respectiva receita.
         """
-        self.dados['receita'] = self.dados['vendas'] * self.dados['valor_do_veiculo']
-        receita_por_veiculo = self.dados.groupby('nome')['receita'].sum()
-        receita_por_veiculo = receita_por_veiculo.sort_values(ascending=False)
-        return pd.DataFrame({
-            'Nome do Veículo': receita_por_veiculo.index,
-            'Receita (R$)': receita_por_veiculo.values
-        })
-
-    def criar_tabela(self) -> None:
-        """
-        Cria um DataFrame com as informações de receita, formata a tabela e a visualiza.
-        """
-        tabela_receita = self.calcular_receita()
-
-        # Formatar a coluna 'Receita (R$)' para moeda brasileira
-        tabela_receita['Receita (R$)'] = tabela_receita['Receita (R$)'].map('{:,.2f}'.format)
-
-        # Calculando o total
-        total_receita = tabela_receita['Receita (R$)'].str.replace(',', '').astype(float).sum()
-
-        # Formatar todos os valores da coluna 'Receita (R$)' sem o prefixo 'R$'
-        tabela_receita['Receita (R$)'] = tabela_receita['Receita (R$)'].replace('[\$,]', '', regex=True).astype(float).map('{:,.2f}'.format)
+        return agregacoes.receita_por_veiculo(self.codificados)
 
-        # Adicionando uma linha com o total ao DataFrame
-        tabela_receita.loc[len(tabela_receita)] = ['Total', '{:,.2f}'.format(total_receita)]
-
-        # Criando uma figura e eixo para a tabela
-        fig, ax = plt.subplots(figsize=(16, 8))
-        ax.axis('off')  # Desativando os eixos
-
-        # Criando a tabela
-        table_data = [list(row) for _, row in tabela_receita.iterrows()]
-
-        # Criando uma escala de cinza para as células da tabela
-        gray_cmap = LinearSegmentedColormap.from_list('gray_cmap', ['#F0F0F0', '#D9D9D9', '#C0C0C0'])
-
-        # Adicionando a tabela ao eixo
-        table = ax.table(cellText=table_data, colLabels=tabela_receita.columns, cellLoc='center', loc='center', bbox=[0, 0, 1, 1])
+    def criar_tabela(self, caminho_saida: str = 'tabela_receita.png') -> None:
+        """
+        Cria um DataFrame com as informações de receita e o exporta, com o total no rodapé.
 
-        # Estilizando a tabela com design moderno em tons de cinza
-        table.auto_set_column_width([0, 1])
-        table.set_fontsize(10)
-        table.scale(2, 2)
+        O total só aparece nas saídas de apresentação (PNG e HTML); CSV, JSONL e Parquet
+        recebem apenas as linhas por veículo.
 
-        # Iterando sobre as células da tabela
-        for i, key in enumerate(table._cells):
-            cell = table._cells[key]
-            if i >= 0:  # Ignorando o cabeçalho
-                cell.set_facecolor(gray_cmap(i % gray_cmap.N))
-                cell.set_edgecolor('white')
+        O formato é definido pela extensão de `caminho_saida` (.png, .csv, .jsonl, .parquet ou .html).
+        Tabelas grandes demais para uma imagem são exportadas em HTML no lugar do PNG.
 
-        # Adicionando uma borda à tabela
-        ax.add_table(table)
-        plt.savefig('tabela_receita.png')
-        plt.show()
+        Args:
+            caminho_saida (str): Caminho do arquivo de saída.
+        """
+        tabela_receita = self.calcular_receita()
+        total_receita = tabela_receita['Receita (R$)'].sum()
+
+        exibir = caminho_saida.lower().endswith('.png')
+        if exibir and len(tabela_receita) + 1 > LIMITE_LINHAS_PNG:
+            caminho_saida = os.path.splitext(caminho_saida)[0] + '.html'
+            exibir = False
+            print(f'A tabela tem {len(tabela_receita)} linhas; exportando como {caminho_saida}.')
+
+        # Formatar a coluna 'Receita (R$)' no padrão de moeda apenas na exibição
+        exportar_tabela(tabela_receita, caminho_saida, titulo='Receita por Veículo',
+                        formatadores={'Receita (R$)': '{:,.2f}'}, cache=CacheRenderizacao() if exibir else None,
+                        rodape={'Nome do Veículo': 'Total', 'Receita (R$)': total_receita})
+        if exibir:
+            plt.show()
 
 def main():
     """
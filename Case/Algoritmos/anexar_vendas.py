@@ -0,0 +1,64 @@
+import argparse
+import os
+
+import pandas as pd
+
+from relatorios.amostragem import carregar_ou_construir_amostra
+from relatorios.incremental import AgregadosIncrementais
+from relatorios.particionamento import particionar_se_desatualizado
+from relatorios.validacao import assinatura_arquivo, avisar_quarentena
+
+def carregar_ou_construir_agregados(arquivo_dados: str, arquivo_estado: str) -> AgregadosIncrementais:
+    """
+    Carrega os agregados gravados ou, se eles ainda não existirem ou não corresponderem mais ao
+    arquivo de dados (tamanho ou data de modificação diferentes), os constrói a partir dele.
+
+    Parameters:
+    - arquivo_dados (str): O caminho do arquivo CSV tratado.
+    - arquivo_estado (str): O caminho do arquivo JSON com os agregados.
+
+    Returns:
+    - AgregadosIncrementais: Os agregados prontos para receber novas linhas.
+    """
+    if os.path.exists(arquivo_estado):
+        agregados = AgregadosIncrementais.carregar(arquivo_estado)
+        if agregados.assinatura == assinatura_arquivo(arquivo_dados):
+            return agregados
+        print(f'{arquivo_estado} não corresponde a {arquivo_dados}; reconstruindo os agregados.')
+    return AgregadosIncrementais.construir(arquivo_dados)
+
+def main():
+    """
+    Função principal para anexar novas vendas ao conjunto de dados e atualizar os relatórios
+    sem recalculá-los sobre o arquivo inteiro.
+    """
+    parser = argparse.ArgumentParser(description='Anexa novas vendas ao conjunto de dados e atualiza os agregados.')
+    parser.add_argument('novas', help='CSV com as novas vendas, no formato de dados_cleaned.csv.')
+    parser.add_argument('--arquivo', default='Dataset/dados_cleaned.csv', help='Arquivo de dados que recebe as linhas.')
+    parser.add_argument('--estado', default='Dataset/agregados.json', help='Arquivo JSON com os agregados mantidos.')
+    parser.add_argument('--particoes', help='Diretório do conjunto particionado por ano/mês a atualizar '
+                                            '(reconstruído se não existir ou estiver desatualizado).')
+    parser.add_argument('--amostra', help='Diretório da amostra estratificada a atualizar '
+                                          '(reconstruída se não existir ou estiver desatualizada).')
+    parser.add_argument('--relatorio', default='vendas_por_marca', help='Relatório exibido após a atualização.')
+    argumentos = parser.parse_args()
+
+    agregados = carregar_ou_construir_agregados(argumentos.arquivo, argumentos.estado)
+    if argumentos.particoes and particionar_se_desatualizado(argumentos.arquivo, argumentos.particoes):
+        print(f'{argumentos.particoes} não correspondia a {argumentos.arquivo}; partições reconstruídas.')
+    amostra = carregar_ou_construir_amostra(argumentos.arquivo, argumentos.amostra) if argumentos.amostra else None
+
+    novas = pd.read_csv(argumentos.novas, dtype=str, keep_default_na=False, na_values=[''])
+    validas = agregados.anexar(novas, argumentos.arquivo, diretorio_particoes=argumentos.particoes, amostra=amostra)
+
+    avisar_quarentena(validas.attrs)
+
+    agregados.salvar(argumentos.estado)
+    if amostra is not None:
+        amostra.salvar(argumentos.amostra)
+
+    print(f'{len(validas)} linhas anexadas a {argumentos.arquivo}; {agregados.total_linhas} linhas no total.')
+    print(agregados.tabela(argumentos.relatorio))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from relatorios.amostragem import carregar_ou_construir_amostra
+
+def main():
+    """
+    Função principal para executar o exemplo de consultas aproximadas sobre a amostra.
+    """
+    arquivo_dados = 'Dataset/dados_cleaned.csv'
+    diretorio_amostra = 'Dataset/amostra'
+
+    amostra = carregar_ou_construir_amostra(arquivo_dados, diretorio_amostra)
+    print(f'Amostra com {len(amostra.amostra)} de {amostra.total_linhas} linhas.')
+
+    # Estimativas com intervalos de 95% de confiança
+    print(amostra.calcular_media_vendas())
+    print(amostra.calcular_vendas_por_marca())
+    print(amostra.calcular_matriz_correlacao())
+
+if __name__ == "__main__":
+    main()
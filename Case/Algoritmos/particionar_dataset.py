@@ -0,0 +1,35 @@
+from relatorios.particionamento import particionar_arquivo, relatorio_por_ano
+from relatorios.validacao import avisar_quarentena
+
+def particionar_dataset(arquivo_entrada: str, diretorio_saida: str) -> None:
+    """
+    Grava o conjunto de dados tratado em partições de ano/mês, com estatísticas de mínimo e
+    máximo por partição, para que os relatórios por período leiam apenas os meses necessários.
+
+    Parameters:
+    - arquivo_entrada (str): O caminho do arquivo CSV tratado.
+    - diretorio_saida (str): O diretório onde as partições serão gravadas.
+
+    Returns:
+    - None
+    """
+    resumo = {}
+    estatisticas = particionar_arquivo(arquivo_entrada, diretorio_saida, resumo=resumo)
+    avisar_quarentena(resumo)
+    total_linhas = sum(estatistica['linhas'] for estatistica in estatisticas.values())
+    print(f'{total_linhas} linhas gravadas em {len(estatisticas)} partições em {diretorio_saida}.')
+
+def main():
+    """
+    Função principal para executar o exemplo de particionamento e um relatório por ano.
+    """
+    arquivo_entrada = 'Dataset/dados_cleaned.csv'
+    diretorio_saida = 'Dataset/particoes'
+
+    particionar_dataset(arquivo_entrada, diretorio_saida)
+
+    # Média de vendas por marca em cada ano (versão por período de Media_Vendas_Por_Ano.sql)
+    print(relatorio_por_ano(diretorio_saida, 'media_vendas_por_marca'))
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
+import os
+
 import pandas as pd
 import matplotlib.pyplot as plt
-from pandas.plotting import table
+
+from relatorios.exportacao import LIMITE_LINHAS_PNG, exportar_tabela
+from relatorios.validacao import avisar_quarentena, carregar_dados_validados
 
 class TabelaReceitaPlotter:
     """
     A classe TabelaReceitaPlotter é responsável por carregar dados de um arquivo CSV,
-    calcular a receita por marca, criar uma tabela com as informações relevantes e gerar
-    um gráfico de tabela destacando a receita total.
+    calcular a receita por marca, criar uma tabela com as informações relevantes e exportá-la
+    com a receita total no rodapé.
 
     Attributes:
         caminho_arquivo (str): O caminho do arquivo CSV contendo os dados.
@@ -23,12 +27,15 @@ class TabelaReceitaPlotter:
 
     def carregar_dados(self):
         """
-        Carrega os dados do arquivo CSV e retorna o DataFrame correspondente.
+        Carrega e valida os dados do arquivo CSV e retorna o DataFrame correspondente.
+        Linhas inválidas são enviadas para a quarentena.
 
         Returns:
             pd.DataFrame: DataFrame carregado a partir do arquivo CSV.
         """
-        return pd.read_csv(self.caminho_arquivo)
+        dados = carregar_dados_validados(self.caminho_arquivo)
+        avisar_quarentena(dados.attrs)
+        return dados
 
     def calcular_receita_por_marca(self, dados):
         """
@@ -40,8 +47,8 @@ class TabelaReceitaPlotter:
         Returns:
             pd.Series: Série contendo a receita total por marca.
         """
-        grupo_marca = dados.groupby('marca')
-        return grupo_marca['vendas', 'valor_do_veiculo'].apply(lambda x: (x['vendas'] * x['valor_do_veiculo']).sum())
+        receita = dados['vendas'] * dados['valor_do_veiculo']
+        return receita.groupby(dados['marca']).sum()
 
     def criar_tabela_df(self, dados, receita_por_marca):
         """
@@ -52,73 +59,55 @@ class TabelaReceitaPlotter:
             receita_por_marca (pd.Series): Série com a receita total por marca.
 
         Returns:
-            pd.DataFrame: DataFrame para a tabela.
+            pd.DataFrame: DataFrame para a tabela, com uma linha por venda.
         """
-        tabela_df = pd.DataFrame(columns=['Data', 'ID_Marca', 'Vendas', 'Valor/Veículo', 'Nome', 'Marca', 'Receita'])
-        total_receita = 0
-
-        for indice, linha in dados.iterrows():
-            marca = linha['marca']
-            if marca not in receita_por_marca:
-                continue
-
-            receita = linha['vendas'] * linha['valor_do_veiculo']
-            total_receita += receita
-
-            tabela_df = tabela_df.append({
-                'Data': linha['data'],
-                'ID_Marca': linha['id_marca_'],
-                'Vendas': linha['vendas'],
-                'Valor/Veículo': linha['valor_do_veiculo'],
-                'Nome': linha['nome'],
-                'Marca': marca,
-                'Receita': receita
-            }, ignore_index=True)
-
-        tabela_df = tabela_df.append({'Receita': total_receita}, ignore_index=True)
+        dados = dados[dados['marca'].isin(receita_por_marca.index)]
+        tabela_df = pd.DataFrame({
+            'Data': dados['data'],
+            'ID_Marca': dados['id_marca_'],
+            'Vendas': dados['vendas'],
+            'Valor/Veículo': dados['valor_do_veiculo'],
+            'Nome': dados['nome'],
+            'Marca': dados['marca'],
+            'Receita': dados['vendas'] * dados['valor_do_veiculo']
+        }).reset_index(drop=True)
         return tabela_df
 
-    def plotar_tabela_receita(self, tabela_df, total_receita):
+    def exportar_tabela_receita(self, tabela_df, caminho_saida='tabela_receita.png'):
         """
-        Gera um gráfico de tabela destacando a receita total.
+        Exporta a tabela de receita. O formato é definido pela extensão de `caminho_saida`;
+        tabelas grandes demais para uma imagem são exportadas em HTML no lugar do PNG.
+        A receita total só aparece no rodapé do HTML e do PNG.
 
         Args:
             tabela_df (pd.DataFrame): DataFrame para a tabela.
-            total_receita (float): Receita total a ser destacada.
+            caminho_saida (str): Caminho do arquivo de saída.
         """
-        # Criar figura e eixo
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.axis('off')
-
-        # Criar a tabela e adicionar à figura
-        tbl = table(ax, tabela_df, loc='center', colWidths=[0.1] * len(tabela_df.columns),
-                    cellLoc='center', colColours=['#f5f5f5'] * len(tabela_df.columns))
-        tbl.auto_set_font_size(False)
-        tbl.set_fontsize(10)
-        tbl.scale(1.2, 1.2)
-
-        # Adicionar linha de destaque para o total
-        tabela_df = tabela_df.append({'Receita': total_receita}, ignore_index=True)
-
-        # Salvar a figura como PNG
-        plt.savefig('tabela_receita.png', bbox_inches='tight', pad_inches=0.5)
-        plt.show()
+        exibir = caminho_saida.lower().endswith('.png')
+        if exibir and len(tabela_df) + 1 > LIMITE_LINHAS_PNG:
+            caminho_saida = os.path.splitext(caminho_saida)[0] + '.html'
+            exibir = False
+            print(f'A tabela tem {len(tabela_df)} linhas; exportando como {caminho_saida}.')
+
+        exportar_tabela(tabela_df, caminho_saida, titulo='Receita por Venda',
+                        formatadores={'Valor/Veículo': '{:,.2f}', 'Receita': '{:,.2f}'},
+                        rodape={'Data': 'Total', 'Receita': tabela_df['Receita'].sum()})
+        if exibir:
+            plt.show()
 
     def executar(self):
         """
         Executa o processo completo de carregar dados, calcular receita por marca,
-        criar a tabela e gerar o gráfico de tabela.
+        criar a tabela e exportá-la.
         """
         dados = self.carregar_dados()
         receita_por_marca = self.calcular_receita_por_marca(dados)
         tabela_df = self.criar_tabela_df(dados, receita_por_marca)
-        total_receita = tabela_df.loc[tabela_df['Receita'].idxmax(), 'Receita']
-        self.plotar_tabela_receita(tabela_df, total_receita)
+        self.exportar_tabela_receita(tabela_df)
 
 
-# Exemplo de uso
-caminho_arquivo = "Dataset/dados_cleaned.csv"
-tabela_plotter = TabelaReceitaPlotter(caminho_arquivo)
-tabela_plotter.executar()
- 
- 
\ No newline at end of file
+if __name__ == "__main__":
+    # Exemplo de uso
+    caminho_arquivo = "Dataset/dados_cleaned.csv"
+    tabela_plotter = TabelaReceitaPlotter(caminho_arquivo)
+    tabela_plotter.executar()
@@ -0,0 +1,57 @@
+"""
+Pacote com os componentes compartilhados pelos relatórios do case.
+
+Os scripts em `Querys/` e `receita.py` importam daqui a carga validada dos dados, o conjunto
+particionado por ano/mês, as agregações dos relatórios, as rotinas de exportação de tabelas,
+o cache de imagens, a amostra estratificada para consultas aproximadas e os agregados
+atualizados incrementalmente, para que o cálculo dos relatórios fique separado da forma como
+os dados são lidos e o resultado é gravado.
+"""
+
+from relatorios.agregacoes import RELATORIOS, DadosCodificados, codificar
+from relatorios.amostragem import AmostraEstratificada
+from relatorios.cache_renderizacao import CacheRenderizacao
+from relatorios.exportacao import (
+    FORMATOS_SUPORTADOS,
+    LIMITE_LINHAS_PNG,
+    exportar_tabela,
+    renderizar_tabela_png,
+)
+from relatorios.incremental import AgregadosIncrementais
+from relatorios.particionamento import (
+    carregar_intervalo,
+    particionar_arquivo,
+    relatorio_por_ano,
+    relatorio_por_mes,
+    relatorio_ultimos_dias,
+)
+from relatorios.validacao import (
+    ESQUEMA,
+    MARCAS_CONHECIDAS,
+    avisar_quarentena,
+    carregar_dados_validados,
+    validar_bloco,
+)
+
+__all__ = [
+    'RELATORIOS',
+    'DadosCodificados',
+    'codificar',
+    'AmostraEstratificada',
+    'CacheRenderizacao',
+    'FORMATOS_SUPORTADOS',
+    'LIMITE_LINHAS_PNG',
+    'exportar_tabela',
+    'renderizar_tabela_png',
+    'AgregadosIncrementais',
+    'carregar_intervalo',
+    'particionar_arquivo',
+    'relatorio_por_ano',
+    'relatorio_por_mes',
+    'relatorio_ultimos_dias',
+    'ESQUEMA',
+    'MARCAS_CONHECIDAS',
+    'avisar_quarentena',
+    'carregar_dados_validados',
+    'validar_bloco',
+]
@@ -0,0 +1,368 @@
+import numpy as np
+import pandas as pd
+
+# Cada função recebe as linhas já validadas (ver validacao.py) e devolve a mesma tabela que o
+# relatório correspondente em Querys/ calcula, para que possa ser aplicada a qualquer recorte
+# dos dados (um período, uma amostra, o acumulado incremental).
+#
+# Os agrupamentos têm poucas chaves (11 marcas, algumas dezenas de veículos), então em vez do
+# groupby genérico do pandas, que faz hash das strings a cada chamada, as chaves são convertidas
+# uma vez em códigos inteiros densos (DadosCodificados) e as somas e contagens saem de
+# np.bincount sobre arrays contíguos.
+
+
+class DadosCodificados:
+    """
+    Linhas de vendas com as chaves de agrupamento convertidas em códigos inteiros densos.
+
+    Os códigos de cada chave são calculados na primeira vez em que ela é usada e reaproveitados
+    nas agregações seguintes. As categorias de cada chave ficam em ordem crescente, a mesma
+    ordem em que o groupby do pandas devolve os grupos.
+
+    Attributes:
+        dados (pd.DataFrame): As linhas originais.
+        vendas (np.ndarray): Coluna 'vendas' como array contíguo.
+        valor_do_veiculo (np.ndarray): Coluna 'valor_do_veiculo' como array contíguo de float64.
+    """
+
+    def __init__(self, dados: pd.DataFrame):
+        """
+        Inicializa a codificação.
+
+        Args:
+            dados (pd.DataFrame): Linhas de vendas.
+        """
+        self.dados = dados
+        self.vendas = np.ascontiguousarray(dados['vendas'].to_numpy())
+        self.valor_do_veiculo = np.ascontiguousarray(dados['valor_do_veiculo'].to_numpy(dtype=np.float64))
+        self._codigos = {}
+        self._receita = None
+
+    def __len__(self) -> int:
+        return len(self.dados)
+
+    @property
+    def receita(self) -> np.ndarray:
+        """
+        Receita de cada linha (vendas x valor do veículo).
+        """
+        if self._receita is None:
+            self._receita = self.vendas * self.valor_do_veiculo
+        return self._receita
+
+    def codigos(self, chave: str) -> tuple:
+        """
+        Códigos inteiros de uma chave de agrupamento ('marca', 'nome' ou 'mes').
+
+        Args:
+            chave (str): Nome da chave.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Os códigos de cada linha (de 0 a k-1) e as k categorias,
+            em ordem crescente.
+        """
+        if chave not in self._codigos:
+            if chave == 'marca' and 'id_marca_' in self.dados.columns:
+                self._codigos[chave] = self._codificar_marca()
+            elif chave == 'mes':
+                meses = pd.to_datetime(self.dados['data']).dt.month.to_numpy()
+                categorias = np.flatnonzero(np.bincount(meses, minlength=13))
+                self._codigos[chave] = (np.searchsorted(categorias, meses), categorias)
+            else:
+                codigos, categorias = pd.factorize(self.dados[chave], sort=True)
+                self._codigos[chave] = (codigos, np.asarray(categorias, dtype=object))
+        return self._codigos[chave]
+
+    def _codificar_marca(self) -> tuple:
+        """
+        Codifica a marca a partir de id_marca_, que já é um inteiro pequeno.
+
+        A validação garante que cada id corresponde a uma única marca, então basta ler o nome da
+        primeira linha de cada id e reordenar os códigos pela ordem alfabética das marcas.
+        """
+        ids = self.dados['id_marca_'].to_numpy(dtype=np.int64)
+        if len(ids) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=object)
+        primeira_linha = np.full(ids.max() + 1, -1, dtype=np.int64)
+        primeira_linha[ids[::-1]] = np.arange(len(ids) - 1, -1, -1)
+        presentes = np.flatnonzero(primeira_linha >= 0)
+        nomes = self.dados['marca'].to_numpy(dtype=object)[primeira_linha[presentes]]
+
+        ordem = np.argsort(nomes, kind='stable')
+        posicao = np.empty(ids.max() + 1, dtype=np.int64)
+        posicao[presentes[ordem]] = np.arange(len(presentes))
+        return posicao[ids], nomes[ordem]
+
+    def somar(self, chave: str, pesos: np.ndarray = None) -> np.ndarray:
+        """
+        Soma os pesos de cada categoria da chave (ou conta as linhas, se `pesos` for omitido).
+
+        Args:
+            chave (str): Nome da chave de agrupamento.
+            pesos (np.ndarray, optional): Valor de cada linha.
+
+        Returns:
+            np.ndarray: Um total por categoria, na ordem de `codigos(chave)[1]`.
+        """
+        codigos, categorias = self.codigos(chave)
+        return np.bincount(codigos, weights=pesos, minlength=len(categorias))
+
+
+def codificar(dados) -> DadosCodificados:
+    """
+    Devolve `dados` como DadosCodificados, reaproveitando a codificação se já for um.
+    """
+    return dados if isinstance(dados, DadosCodificados) else DadosCodificados(dados)
+
+
+def _somar_vendas(codificados: DadosCodificados, chave: str) -> np.ndarray:
+    """
+    Soma de 'vendas' por categoria, preservando o tipo inteiro da coluna.
+    """
+    totais = codificados.somar(chave, codificados.vendas)
+    if np.issubdtype(codificados.vendas.dtype, np.integer):
+        return np.rint(totais).astype(np.int64)
+    return totais
+
+
+def totais_por_chave(dados, chave: str, colunas: list) -> pd.DataFrame:
+    """
+    Totais por categoria de uma chave de agrupamento ('marca' ou 'nome').
+
+    Args:
+        dados (pd.DataFrame | DadosCodificados): Linhas de vendas.
+        chave (str): Nome da chave de agrupamento.
+        colunas (list): Totais desejados: 'contagem', 'vendas', 'valor_do_veiculo' e/ou 'receita'.
+
+    Returns:
+        pd.DataFrame: Uma coluna por total, indexada pelas categorias da chave em ordem crescente.
+    """
+    codificados = codificar(dados)
+    valores = {}
+    for coluna in colunas:
+        if coluna == 'contagem':
+            valores[coluna] = codificados.somar(chave).astype(np.int64)
+        elif coluna == 'vendas':
+            valores[coluna] = _somar_vendas(codificados, chave)
+        else:
+            valores[coluna] = codificados.somar(chave, getattr(codificados, coluna))
+    return pd.DataFrame(valores, index=pd.Index(codificados.codigos(chave)[1], name=chave))
+
+
+# As funções montar_* recebem totais por chave (indexados pela chave, em ordem crescente) e
+# montam a tabela do relatório. São compartilhadas pelo cálculo direto sobre as linhas e pelos
+# agregados mantidos incrementalmente (ver incremental.py), que assim devolvem tabelas idênticas.
+
+def montar_vendas_por_marca(totais: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monta vendas_por_marca a partir dos totais por marca (coluna 'vendas').
+    """
+    vendas = pd.DataFrame({'marca': totais.index.to_numpy(dtype=object), 'vendas': totais['vendas'].to_numpy()})
+    return vendas.sort_values(by='vendas', ascending=False)
+
+
+def montar_receita_por_veiculo(totais: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monta receita_por_veiculo a partir dos totais por veículo (coluna 'receita').
+    """
+    receita = pd.Series(totais['receita'].to_numpy(), index=totais.index.to_numpy(dtype=object))
+    receita = receita.sort_values(ascending=False)
+    return pd.DataFrame({
+        'Nome do Veículo': receita.index,
+        'Receita (R$)': receita.values
+    })
+
+
+def montar_media_ponderada_por_marca(totais: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monta media_ponderada_por_marca a partir dos totais por marca ('contagem' e 'vendas').
+    """
+    soma = totais['vendas'].to_numpy(dtype=np.float64)
+    contagem = totais['contagem'].to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.where(soma != 0, soma / contagem, np.nan)
+    return pd.DataFrame({'marca': totais.index.to_numpy(dtype=object), 'Media_Vendas': media})
+
+
+def montar_media_vendas_por_marca(totais: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monta media_vendas_por_marca a partir dos totais por marca ('contagem' e 'vendas').
+    """
+    media = totais['vendas'].to_numpy(dtype=np.float64) / totais['contagem'].to_numpy(dtype=np.float64)
+    return pd.DataFrame({'marca': totais.index.to_numpy(dtype=object), 'media_de_vendas': media})
+
+
+def montar_top_veiculos(totais: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+    """
+    Monta top_veiculos a partir dos totais por veículo (coluna 'vendas').
+    """
+    tabela = pd.DataFrame({'Veículo': totais.index.to_numpy(dtype=object), 'Vendas Totais': totais['vendas'].to_numpy()})
+    tabela = tabela.sort_values(by='Vendas Totais', ascending=False).head(n)
+    tabela.index = range(1, len(tabela) + 1)
+    return tabela
+
+
+def montar_resumo_por_marca(totais: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monta resumo_por_marca a partir dos totais por marca ('vendas' e 'valor_do_veiculo').
+    """
+    resumo = pd.DataFrame({
+        'Marca': totais.index.to_numpy(dtype=object),
+        'Número de Vendas': totais['vendas'].to_numpy(),
+        'Receita Gerada': totais['valor_do_veiculo'].to_numpy()
+    })
+    return resumo.sort_values(by='Receita Gerada', ascending=False)
+
+
+def montar_serie_marca_mes(totais: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monta serie_marca_mes a partir dos totais por (marca, mês) presentes nos dados
+    ('vendas' e 'valor_do_veiculo').
+    """
+    serie = pd.DataFrame({
+        'marca': totais.index.get_level_values(0).to_numpy(dtype=object),
+        'mes': totais.index.get_level_values(1).to_numpy().astype(np.int32),
+        'vendas': totais['vendas'].to_numpy(),
+        'valor_do_veiculo': totais['valor_do_veiculo'].to_numpy(),
+    })
+    serie['valor_medio'] = serie['valor_do_veiculo'] / serie['vendas']
+    return serie
+
+
+def totais_por_marca_mes(dados) -> pd.DataFrame:
+    """
+    Contagem, vendas e valor do veículo por (marca, mês), apenas para as combinações presentes.
+
+    Args:
+        dados (pd.DataFrame | DadosCodificados): Linhas de vendas.
+
+    Returns:
+        pd.DataFrame: Colunas 'contagem', 'vendas' e 'valor_do_veiculo', indexadas por ('marca', 'mes').
+    """
+    codificados = codificar(dados)
+    codigos_marca, marcas = codificados.codigos('marca')
+    codigos_mes, meses = codificados.codigos('mes')
+
+    # Código composto marca x mês; só entram na tabela as combinações presentes nos dados
+    codigos = codigos_marca * len(meses) + codigos_mes
+    tamanho = len(marcas) * len(meses)
+    contagem = np.bincount(codigos, minlength=tamanho)
+    vendas = np.bincount(codigos, weights=codificados.vendas, minlength=tamanho)
+    valor = np.bincount(codigos, weights=codificados.valor_do_veiculo, minlength=tamanho)
+    presentes = np.flatnonzero(contagem)
+
+    if np.issubdtype(codificados.vendas.dtype, np.integer):
+        vendas = np.rint(vendas).astype(np.int64)
+    indice = pd.MultiIndex.from_arrays([marcas[presentes // len(meses)], meses[presentes % len(meses)].astype(np.int64)],
+                                       names=['marca', 'mes'])
+    return pd.DataFrame({
+        'contagem': contagem[presentes].astype(np.int64),
+        'vendas': vendas[presentes],
+        'valor_do_veiculo': valor[presentes],
+    }, index=indice)
+
+
+def vendas_por_marca(dados) -> pd.DataFrame:
+    """
+    Número total de vendas por marca (GraficoVendas.calcular_vendas_por_marca).
+
+    Args:
+        dados (pd.DataFrame | DadosCodificados): Linhas de vendas.
+
+    Returns:
+        pd.DataFrame: Colunas 'marca' e 'vendas', ordenadas por volume de vendas.
+    """
+    return montar_vendas_por_marca(totais_por_chave(dados, 'marca', ['vendas']))
+
+
+def receita_por_veiculo(dados) -> pd.DataFrame:
+    """
+    Receita (vendas x valor do veículo) por veículo (TabelaReceita.calcular_receita).
+
+    Args:
+        dados (pd.DataFrame | DadosCodificados): Linhas de vendas.
+
+    Returns:
+        pd.DataFrame: Colunas 'Nome do Veículo' e 'Receita (R$)', ordenadas pela receita.
+    """
+    return montar_receita_por_veiculo(totais_por_chave(dados, 'nome', ['receita']))
+
+
+def media_ponderada_por_marca(dados) -> pd.DataFrame:
+    """
+    Média ponderada de vendas por marca (MediaVendasPorMarca.calcular_media_ponderada).
+
+    A ponderação original, soma(vendas x média da marca) / soma(vendas), se reduz à média de
+    vendas da marca, calculada aqui como soma / contagem.
+
+    Args:
+        dados (pd.DataFrame | DadosCodificados): Linhas de vendas.
+
+    Returns:
+        pd.DataFrame: Colunas 'marca' e 'Media_Vendas'.
+    """
+    return montar_media_ponderada_por_marca(totais_por_chave(dados, 'marca', ['contagem', 'vendas']))
+
+
+def media_vendas_por_marca(dados) -> pd.DataFrame:
+    """
+    Média simples de vendas por registro, por marca (SQL Media_Vendas_Por_Ano.sql).
+
+    Args:
+        dados (pd.DataFrame | DadosCodificados): Linhas de vendas.
+
+    Returns:
+        pd.DataFrame: Colunas 'marca' e 'media_de_vendas'.
+    """
+    return montar_media_vendas_por_marca(totais_por_chave(dados, 'marca', ['contagem', 'vendas']))
+
+
+def top_veiculos(dados, n: int = 10) -> pd.DataFrame:
+    """
+    Os N veículos com mais vendas (TabelaTop10Veiculos._obter_top_10_veiculos).
+
+    Args:
+        dados (pd.DataFrame | DadosCodificados): Linhas de vendas.
+        n (int): Quantidade de veículos.
+
+    Returns:
+        pd.DataFrame: Colunas 'Veículo' e 'Vendas Totais', indexadas de 1 a N.
+    """
+    return montar_top_veiculos(totais_por_chave(dados, 'nome', ['vendas']), n)
+
+
+def resumo_por_marca(dados) -> pd.DataFrame:
+    """
+    Número de vendas e receita gerada por marca (AnaliseVendasPorMarca.criar_tabela_resumo).
+
+    Args:
+        dados (pd.DataFrame | DadosCodificados): Linhas de vendas.
+
+    Returns:
+        pd.DataFrame: Colunas 'Marca', 'Número de Vendas' e 'Receita Gerada', ordenadas pela receita.
+    """
+    return montar_resumo_por_marca(totais_por_chave(dados, 'marca', ['vendas', 'valor_do_veiculo']))
+
+
+def serie_marca_mes(dados) -> pd.DataFrame:
+    """
+    Vendas e valor médio por marca e mês (Investiga_popularidade_marcas.py).
+
+    Args:
+        dados (pd.DataFrame | DadosCodificados): Linhas de vendas.
+
+    Returns:
+        pd.DataFrame: Colunas 'marca', 'mes', 'vendas', 'valor_do_veiculo' e 'valor_medio'.
+    """
+    return montar_serie_marca_mes(totais_por_marca_mes(dados))
+
+
+RELATORIOS = {
+    'vendas_por_marca': vendas_por_marca,
+    'receita_por_veiculo': receita_por_veiculo,
+    'media_ponderada_por_marca': media_ponderada_por_marca,
+    'media_vendas_por_marca': media_vendas_por_marca,
+    'top_veiculos': top_veiculos,
+    'resumo_por_marca': resumo_por_marca,
+    'serie_marca_mes': serie_marca_mes,
+}
@@ -0,0 +1,336 @@
+import json
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from relatorios.exportacao import TAMANHO_BLOCO_PADRAO
+from relatorios.validacao import COLUNAS, assinatura_arquivo, iterar_blocos_validados
+
+CAPACIDADE_POR_ESTRATO_PADRAO = 200
+CONFIANCA_PADRAO = 0.95
+
+ARQUIVO_AMOSTRA = 'amostra.csv'
+ARQUIVO_METADADOS = 'metadados.json'
+
+_TIPOS_AMOSTRA = {
+    'id_marca_': 'int64',
+    'vendas': 'int64',
+    'valor_do_veiculo': 'float64',
+    'nome': object,
+    'marca': object,
+    'periodo': object,
+}
+
+
+def _intervalo(estimativa, erro_padrao, confianca: float) -> tuple:
+    """
+    Limites do intervalo de confiança normal para uma estimativa e seu erro padrão.
+    """
+    z = NormalDist().inv_cdf(0.5 + confianca / 2)
+    return estimativa - z * erro_padrao, estimativa + z * erro_padrao
+
+
+class AmostraEstratificada:
+    """
+    Amostra persistente, estratificada por marca (id_marca_) e mês, para consultas aproximadas.
+
+    Cada estrato guarda até `capacidade_por_estrato` linhas, escolhidas por amostragem de
+    reservatório à medida que os dados chegam, junto com o total de linhas vistas no estrato.
+    As estimativas combinam os estratos com pesos N_h / N e vêm acompanhadas de intervalos de
+    confiança; estratos com até `capacidade_por_estrato` linhas são guardados inteiros e não
+    contribuem com erro.
+
+    Attributes:
+        capacidade_por_estrato (int): Número máximo de linhas guardadas por estrato.
+        semente (int): Semente do gerador aleatório, para resultados reprodutíveis.
+        assinatura (dict | None): assinatura_arquivo do arquivo de dados que a amostra representa.
+    """
+
+    def __init__(self, capacidade_por_estrato: int = CAPACIDADE_POR_ESTRATO_PADRAO, semente: int = 0):
+        """
+        Inicializa uma amostra vazia.
+
+        Args:
+            capacidade_por_estrato (int): Número máximo de linhas guardadas por estrato.
+            semente (int): Semente do gerador aleatório.
+        """
+        self.capacidade_por_estrato = capacidade_por_estrato
+        self.semente = semente
+        self._rng = np.random.default_rng(semente)
+        self._reservatorios = {}
+        self._populacao = {}
+        self._amostra = None
+        self.assinatura = None
+
+    @classmethod
+    def construir(cls, caminho_arquivo: str, capacidade_por_estrato: int = CAPACIDADE_POR_ESTRATO_PADRAO,
+                  semente: int = 0, tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> 'AmostraEstratificada':
+        """
+        Constrói a amostra a partir do arquivo de dados, lendo-o em blocos validados.
+
+        Args:
+            caminho_arquivo (str): Caminho do arquivo de dados.
+            capacidade_por_estrato (int): Número máximo de linhas guardadas por estrato.
+            semente (int): Semente do gerador aleatório.
+            tamanho_bloco (int): Número de linhas lidas por vez.
+
+        Returns:
+            AmostraEstratificada: A amostra construída.
+        """
+        amostra = cls(capacidade_por_estrato, semente)
+        amostra.assinatura = assinatura_arquivo(caminho_arquivo)
+        for bloco in iterar_blocos_validados(caminho_arquivo, tamanho_bloco=tamanho_bloco):
+            amostra.atualizar(bloco)
+        return amostra
+
+    def atualizar(self, dados: pd.DataFrame) -> None:
+        """
+        Incorpora novas linhas validadas à amostra, com amostragem de reservatório por estrato.
+
+        Args:
+            dados (pd.DataFrame): Linhas já validadas (ver validacao.py).
+        """
+        if dados.empty:
+            return
+        capacidade = self.capacidade_por_estrato
+        datas = pd.to_datetime(dados['data'])
+        # Chave numérica AAAAMM: agrupar por inteiros é bem mais barato que formatar cada data como texto
+        periodos = datas.dt.year * 100 + datas.dt.month
+
+        for (id_marca, periodo), grupo in dados[COLUNAS].groupby([dados['id_marca_'], periodos], sort=False):
+            chave = (int(id_marca), f'{periodo // 100:04d}-{periodo % 100:02d}')
+            vistos = self._populacao.get(chave, 0)
+            reservatorio = self._reservatorios.get(chave, grupo.iloc[:0])
+
+            # Enquanto o reservatório não está cheio, toda linha entra
+            livres = capacidade - len(reservatorio)
+            if livres > 0:
+                reservatorio = pd.concat([reservatorio, grupo.iloc[:livres]], ignore_index=True)
+                vistos += min(livres, len(grupo))
+                grupo = grupo.iloc[livres:]
+
+            if len(grupo):
+                # A i-ésima linha do fluxo (base 0) substitui uma posição sorteada em [0, i] se ela for < capacidade
+                posicoes = vistos + np.arange(len(grupo))
+                sorteios = self._rng.integers(0, posicoes + 1)
+                aceitas = np.flatnonzero(sorteios < capacidade)
+                if len(aceitas):
+                    # Se a mesma posição é sorteada mais de uma vez no bloco, vale a última linha, como no algoritmo sequencial
+                    invertidos = sorteios[aceitas][::-1]
+                    _, primeiras = np.unique(invertidos, return_index=True)
+                    finais = aceitas[::-1][primeiras]
+                    reservatorio = pd.concat([reservatorio.drop(index=sorteios[finais]), grupo.iloc[finais]],
+                                             ignore_index=True)
+                vistos += len(grupo)
+
+            self._reservatorios[chave] = reservatorio
+            self._populacao[chave] = vistos
+        self._amostra = None
+
+    @property
+    def amostra(self) -> pd.DataFrame:
+        """
+        Todas as linhas da amostra, com as colunas 'periodo' (AAAA-MM), 'populacao' (N_h)
+        e 'peso' (N_h / n_h).
+        """
+        if self._amostra is None:
+            partes = []
+            for (id_marca, periodo), reservatorio in self._reservatorios.items():
+                partes.append(reservatorio.assign(periodo=periodo, populacao=self._populacao[(id_marca, periodo)],
+                                                  peso=self._populacao[(id_marca, periodo)] / len(reservatorio)))
+            colunas = COLUNAS + ['periodo', 'populacao', 'peso']
+            self._amostra = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=colunas)
+        return self._amostra
+
+    @property
+    def total_linhas(self) -> int:
+        """
+        Número de linhas do conjunto completo representado pela amostra.
+        """
+        return int(sum(self._populacao.values()))
+
+    def _estatisticas_estratos(self, coluna: str) -> pd.DataFrame:
+        """
+        Tamanho, média e variância amostral de uma coluna em cada estrato.
+        """
+        grupos = self.amostra.groupby(['id_marca_', 'periodo'])
+        estatisticas = pd.DataFrame({
+            'marca': grupos['marca'].first(),
+            'n': grupos.size(),
+            'N': grupos['populacao'].first(),
+            'media': grupos[coluna].mean(),
+            'variancia': grupos[coluna].var(ddof=1).fillna(0.0),
+        })
+        # Variância da média do estrato, com correção para população finita (zero se o estrato está completo)
+        fpc = 1 - estatisticas['n'] / estatisticas['N']
+        estatisticas['variancia_total'] = estatisticas['N'] ** 2 * fpc * estatisticas['variancia'] / estatisticas['n']
+        return estatisticas
+
+    def calcular_media_vendas(self, confianca: float = CONFIANCA_PADRAO) -> pd.DataFrame:
+        """
+        Estimativa de AVG(vendas) sobre todas as linhas (Media_Vendas.sql).
+
+        Args:
+            confianca (float): Nível de confiança do intervalo.
+
+        Returns:
+            pd.DataFrame: Uma linha com 'media_de_vendas', 'erro_padrao', 'ic_inferior' e 'ic_superior'.
+        """
+        estatisticas = self._estatisticas_estratos('vendas')
+        total = estatisticas['N'].sum()
+        media = (estatisticas['N'] * estatisticas['media']).sum() / total
+        erro_padrao = np.sqrt(estatisticas['variancia_total'].sum()) / total
+        inferior, superior = _intervalo(media, erro_padrao, confianca)
+        return pd.DataFrame({'media_de_vendas': [media], 'erro_padrao': [erro_padrao],
+                             'ic_inferior': [inferior], 'ic_superior': [superior]})
+
+    def calcular_vendas_por_marca(self, confianca: float = CONFIANCA_PADRAO) -> pd.DataFrame:
+        """
+        Estimativa das vendas totais e da participação de cada marca (GraficoVendas).
+
+        A participação é um estimador de razão (total da marca / total geral); o erro padrão
+        vem da linearização da razão sobre os estratos.
+
+        Args:
+            confianca (float): Nível de confiança dos intervalos.
+
+        Returns:
+            pd.DataFrame: Colunas 'marca', 'vendas', 'vendas_ic_inferior', 'vendas_ic_superior',
+            'participacao', 'participacao_ic_inferior' e 'participacao_ic_superior', ordenadas por vendas.
+        """
+        estatisticas = self._estatisticas_estratos('vendas')
+        estatisticas['total'] = estatisticas['N'] * estatisticas['media']
+        por_marca = estatisticas.groupby('marca')[['total', 'variancia_total']].sum()
+
+        total_geral = por_marca['total'].sum()
+        variancia_geral = por_marca['variancia_total'].sum()
+        participacao = por_marca['total'] / total_geral
+        variancia_participacao = ((1 - participacao) ** 2 * por_marca['variancia_total']
+                                  + participacao ** 2 * (variancia_geral - por_marca['variancia_total'])) / total_geral ** 2
+
+        vendas_inferior, vendas_superior = _intervalo(por_marca['total'], np.sqrt(por_marca['variancia_total']), confianca)
+        part_inferior, part_superior = _intervalo(participacao, np.sqrt(variancia_participacao), confianca)
+        tabela = pd.DataFrame({
+            'marca': por_marca.index,
+            'vendas': por_marca['total'].values,
+            'vendas_ic_inferior': vendas_inferior.values,
+            'vendas_ic_superior': vendas_superior.values,
+            'participacao': participacao.values,
+            'participacao_ic_inferior': part_inferior.clip(lower=0).values,
+            'participacao_ic_superior': part_superior.clip(upper=1).values,
+        })
+        return tabela.sort_values(by='vendas', ascending=False)
+
+    def calcular_matriz_correlacao(self, colunas: list = None, confianca: float = CONFIANCA_PADRAO) -> pd.DataFrame:
+        """
+        Estimativa da correlação de Pearson entre pares de colunas (MatrizCorrelacaoPlotter).
+
+        Cada linha da amostra pesa N_h / n_h. O intervalo usa a transformação de Fisher com o
+        tamanho efetivo de amostra de Kish, (soma dos pesos)² / soma dos pesos².
+
+        Args:
+            colunas (list, optional): Colunas numéricas. Padrão: ['vendas', 'valor_do_veiculo'].
+            confianca (float): Nível de confiança dos intervalos.
+
+        Returns:
+            pd.DataFrame: Uma linha por par de colunas, com 'coluna_1', 'coluna_2', 'correlacao',
+            'ic_inferior' e 'ic_superior'.
+        """
+        colunas = colunas or ['vendas', 'valor_do_veiculo']
+        amostra = self.amostra
+        pesos = amostra['peso'].to_numpy(dtype=float)
+        valores = amostra[colunas].to_numpy(dtype=float)
+
+        centrados = valores - np.average(valores, axis=0, weights=pesos)
+        covariancia = (centrados * pesos[:, None]).T @ centrados
+        desvios = np.sqrt(np.diag(covariancia))
+        correlacao = covariancia / np.outer(desvios, desvios)
+
+        tamanho_efetivo = pesos.sum() ** 2 / (pesos ** 2).sum()
+        completa = bool((pesos == 1).all())
+        z = NormalDist().inv_cdf(0.5 + confianca / 2)
+        linhas = []
+        for i in range(len(colunas)):
+            for j in range(i + 1, len(colunas)):
+                r = float(np.clip(correlacao[i, j], -1.0, 1.0))
+                if completa:
+                    # Todos os estratos estão inteiros na amostra: a correlação é exata
+                    inferior = superior = r
+                elif tamanho_efetivo > 3 and abs(r) < 1:
+                    margem = z / np.sqrt(tamanho_efetivo - 3)
+                    inferior, superior = np.tanh(np.arctanh(r) - margem), np.tanh(np.arctanh(r) + margem)
+                else:
+                    inferior, superior = -1.0, 1.0
+                linhas.append({'coluna_1': colunas[i], 'coluna_2': colunas[j], 'correlacao': r,
+                               'ic_inferior': inferior, 'ic_superior': superior})
+        return pd.DataFrame(linhas)
+
+    def salvar(self, diretorio: str) -> None:
+        """
+        Grava a amostra, as populações dos estratos e o estado do gerador aleatório.
+
+        Args:
+            diretorio (str): Diretório de destino.
+        """
+        os.makedirs(diretorio, exist_ok=True)
+        amostra = self.amostra[COLUNAS + ['periodo']]
+        amostra.to_csv(os.path.join(diretorio, ARQUIVO_AMOSTRA), index=False, date_format='%Y-%m-%d')
+
+        metadados = {
+            'capacidade_por_estrato': self.capacidade_por_estrato,
+            'semente': self.semente,
+            'assinatura': self.assinatura,
+            'estado_gerador': self._rng.bit_generator.state,
+            'populacao': [[id_marca, periodo, total] for (id_marca, periodo), total in self._populacao.items()],
+        }
+        caminho = os.path.join(diretorio, ARQUIVO_METADADOS)
+        with open(caminho + '.tmp', 'w', encoding='utf-8') as arquivo:
+            json.dump(metadados, arquivo, indent=2)
+        os.replace(caminho + '.tmp', caminho)
+
+    @classmethod
+    def carregar(cls, diretorio: str) -> 'AmostraEstratificada':
+        """
+        Lê uma amostra gravada por `salvar`, pronta para novas atualizações ou consultas.
+
+        Args:
+            diretorio (str): Diretório da amostra.
+
+        Returns:
+            AmostraEstratificada: A amostra carregada.
+        """
+        with open(os.path.join(diretorio, ARQUIVO_METADADOS), encoding='utf-8') as arquivo:
+            metadados = json.load(arquivo)
+        amostra = cls(metadados['capacidade_por_estrato'], metadados['semente'])
+        amostra._rng.bit_generator.state = metadados['estado_gerador']
+        amostra.assinatura = metadados.get('assinatura')
+        amostra._populacao = {(int(id_marca), periodo): int(total) for id_marca, periodo, total in metadados['populacao']}
+
+        linhas = pd.read_csv(os.path.join(diretorio, ARQUIVO_AMOSTRA), dtype=_TIPOS_AMOSTRA, parse_dates=['data'])
+        for (id_marca, periodo), reservatorio in linhas.groupby(['id_marca_', 'periodo']):
+            amostra._reservatorios[(int(id_marca), periodo)] = reservatorio[COLUNAS].reset_index(drop=True)
+        return amostra
+
+
+def carregar_ou_construir_amostra(caminho_arquivo: str, diretorio: str) -> AmostraEstratificada:
+    """
+    Carrega a amostra gravada em `diretorio` ou, se ela ainda não existir ou não corresponder
+    mais ao arquivo de dados (assinatura_arquivo diferente), a constrói a partir dele e a grava
+    para as próximas consultas.
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo de dados.
+        diretorio (str): Diretório onde a amostra é gravada.
+
+    Returns:
+        AmostraEstratificada: A amostra pronta para consultas aproximadas ou novas atualizações.
+    """
+    if os.path.exists(os.path.join(diretorio, ARQUIVO_METADADOS)):
+        amostra = AmostraEstratificada.carregar(diretorio)
+        if amostra.assinatura == assinatura_arquivo(caminho_arquivo):
+            return amostra
+    amostra = AmostraEstratificada.construir(caminho_arquivo)
+    amostra.salvar(diretorio)
+    return amostra
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+# Fixo em relação ao pacote, para que scripts executados de diretórios diferentes compartilhem o cache
+DIRETORIO_CACHE_PADRAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                      '.cache_renderizacao')
+TAMANHO_MAXIMO_PADRAO = 200 * 1024 * 1024
+
+# Incrementar quando o código de desenho dos gráficos/tabelas mudar, para que imagens geradas
+# pela versão anterior não sejam reaproveitadas.
+VERSAO_RENDERIZACAO = 1
+
+
+def exibir_imagem(caminho: str, figsize: tuple = None):
+    """
+    Abre uma imagem já gravada em uma nova figura, sem eixos, para ser exibida com plt.show().
+
+    Usada quando a imagem vem do cache: o desenho é pulado, mas o resultado continua sendo exibido.
+
+    Args:
+        caminho (str): Caminho da imagem.
+        figsize (tuple, optional): Tamanho da figura. Calculado pelo tamanho da imagem se omitido.
+
+    Returns:
+        matplotlib.figure.Figure: A figura com a imagem.
+    """
+    import matplotlib.pyplot as plt
+
+    imagem = plt.imread(caminho)
+    if figsize is None:
+        dpi = plt.rcParams['figure.dpi']
+        figsize = (imagem.shape[1] / dpi, imagem.shape[0] / dpi)
+    fig = plt.figure(figsize=figsize)
+    eixo = fig.add_axes([0, 0, 1, 1])
+    eixo.imshow(imagem)
+    eixo.axis('off')
+    return fig
+
+
+class CacheRenderizacao:
+    """
+    Cache em disco das imagens geradas pelos relatórios, endereçado pelo conteúdo.
+
+    A chave de cada imagem é o hash da tabela agregada que ela representa junto com a
+    especificação do gráfico (tipo, estilo, paleta, tamanho, título...). Se a mesma chave já
+    foi renderizada, o arquivo é copiado do cache em vez de desenhado de novo. O diretório
+    é limitado a `tamanho_maximo_bytes`, descartando primeiro as imagens usadas há mais tempo.
+
+    Attributes:
+        diretorio (str): Diretório onde as imagens ficam guardadas.
+        tamanho_maximo_bytes (int): Tamanho máximo ocupado pelo cache.
+    """
+
+    def __init__(self, diretorio: str = DIRETORIO_CACHE_PADRAO, tamanho_maximo_bytes: int = TAMANHO_MAXIMO_PADRAO):
+        """
+        Inicializa o cache, criando o diretório se necessário.
+
+        Args:
+            diretorio (str): Diretório onde as imagens ficam guardadas.
+            tamanho_maximo_bytes (int): Tamanho máximo ocupado pelo cache.
+        """
+        self.diretorio = diretorio
+        self.tamanho_maximo_bytes = tamanho_maximo_bytes
+        os.makedirs(diretorio, exist_ok=True)
+
+    def calcular_chave(self, tabela: pd.DataFrame, especificacao: dict) -> str:
+        """
+        Calcula a chave de uma imagem a partir do conteúdo da tabela e da especificação.
+
+        Args:
+            tabela (pd.DataFrame): Tabela agregada representada na imagem.
+            especificacao (dict): Parâmetros visuais do gráfico ou da tabela.
+
+        Returns:
+            str: Hash SHA-256 em hexadecimal.
+        """
+        resumo = hashlib.sha256()
+        resumo.update(json.dumps({'versao': VERSAO_RENDERIZACAO, **especificacao},
+                                 sort_keys=True, default=str).encode('utf-8'))
+        resumo.update(json.dumps([str(coluna) for coluna in tabela.columns]).encode('utf-8'))
+        resumo.update(json.dumps([str(tipo) for tipo in tabela.dtypes]).encode('utf-8'))
+        resumo.update(pd.util.hash_pandas_object(tabela, index=True).to_numpy().tobytes())
+        return resumo.hexdigest()
+
+    def obter_ou_renderizar(self, tabela: pd.DataFrame, especificacao: dict, renderizar, caminho_saida: str) -> bool:
+        """
+        Grava a imagem em `caminho_saida`, reaproveitando a do cache quando a chave já existe.
+
+        Args:
+            tabela (pd.DataFrame): Tabela agregada representada na imagem.
+            especificacao (dict): Parâmetros visuais do gráfico ou da tabela.
+            renderizar (callable): Função que recebe o caminho de saída e desenha a imagem nele.
+            caminho_saida (str): Caminho do arquivo de imagem.
+
+        Returns:
+            bool: True se a imagem veio do cache, False se foi renderizada agora.
+        """
+        extensao = os.path.splitext(caminho_saida)[1].lower() or '.png'
+        arquivo_cache = os.path.join(self.diretorio, self.calcular_chave(tabela, especificacao) + extensao)
+
+        pasta = os.path.dirname(caminho_saida)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        if os.path.exists(arquivo_cache):
+            # A data de modificação marca o último uso, usada para descartar as entradas mais antigas
+            os.utime(arquivo_cache)
+            shutil.copyfile(arquivo_cache, caminho_saida)
+            return True
+
+        renderizar(caminho_saida)
+        temporario = arquivo_cache + '.tmp'
+        shutil.copyfile(caminho_saida, temporario)
+        os.replace(temporario, arquivo_cache)
+        self._limitar_tamanho()
+        return False
+
+    def _limitar_tamanho(self) -> None:
+        """
+        Remove as imagens usadas há mais tempo até o cache caber em `tamanho_maximo_bytes`.
+        """
+        entradas = []
+        for nome in os.listdir(self.diretorio):
+            caminho = os.path.join(self.diretorio, nome)
+            if nome.endswith('.tmp') or not os.path.isfile(caminho):
+                continue
+            informacoes = os.stat(caminho)
+            entradas.append((informacoes.st_mtime, informacoes.st_size, caminho))
+
+        tamanho_total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas):
+            if tamanho_total <= self.tamanho_maximo_bytes:
+                break
+            os.remove(caminho)
+            tamanho_total -= tamanho
+
+    def limpar(self) -> None:
+        """
+        Remove todas as imagens do cache.
+        """
+        for nome in os.listdir(self.diretorio):
+            caminho = os.path.join(self.diretorio, nome)
+            if os.path.isfile(caminho):
+                os.remove(caminho)
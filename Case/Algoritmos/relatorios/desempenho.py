@@ -0,0 +1,415 @@
+import contextlib
+import gc
+import importlib.util
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from relatorios import agregacoes
+from relatorios.exportacao import exportar_tabela
+from relatorios.validacao import MARCAS_CONHECIDAS, carregar_dados_validados
+
+_DIRETORIO_ALGORITMOS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DIRETORIO_LINHAS_DE_BASE = os.path.join(_DIRETORIO_ALGORITMOS, 'desempenho')
+TAMANHOS_PADRAO = (10_000, 100_000)
+REPETICOES_PADRAO = 5
+SEMENTE_PADRAO = 0
+
+# Uma etapa regride quando fica mais lenta (ou usa mais memória) que a linha de base além da
+# tolerância relativa e da folga absoluta; a folga evita falsos alarmes em etapas de milissegundos.
+TOLERANCIA_TEMPO_PADRAO = 0.5
+TOLERANCIA_MEMORIA_PADRAO = 0.10
+FOLGA_TEMPO_PADRAO = 0.005
+FOLGA_MEMORIA_PADRAO = 1024 * 1024
+
+# Execuções de uma etapa que regrediu antes de a regressão ser confirmada; uma nova medição
+# descarta lentidões passageiras da máquina (outro processo, frequência da CPU...)
+TENTATIVAS_PADRAO = 2
+
+# Fração das linhas geradas com valores inválidos, para que a carga exercite a quarentena
+PROPORCAO_INVALIDAS = 0.001
+
+# Modelos e faixa de preço de cada marca, no formato de dados_cleaned.csv
+_CATALOGO = {
+    1: (['Mobi', 'argo', 'Uno', 'Palio', 'Cronos'], (20_000, 90_000)),
+    2: (['Up', 'Gol', 'Kombi', 'Polo', 'T-Cross', 'Jetta', 'Saveiro'], (30_000, 150_000)),
+    3: (['Picanto', 'Cerato', 'Rio'], (40_000, 120_000)),
+    4: (['208', '2008', '307', '206'], (30_000, 110_000)),
+    5: (['Yaris', 'Corolla'], (70_000, 150_000)),
+    6: (['March'], (40_000, 60_000)),
+    7: (['Lancer', 'L200', 'Eclipse', 'Pajero'], (80_000, 250_000)),
+    8: (['Forester', 'XV', 'WRX', 'Brz'], (100_000, 360_000)),
+    9: (['onix'], (50_000, 90_000)),
+    10: (['E-J7', 'E-JS1', 'J5', 'J2'], (60_000, 200_000)),
+    11: (['Captur', 'Duster', 'Sandero', 'Clio', 'Sandero RS'], (40_000, 120_000)),
+}
+
+_ARQUIVO_ESQUEMA_SQL = os.path.join(_DIRETORIO_ALGORITMOS, 'SQL', 'dados_gerais.sql')
+_DIRETORIO_CONSULTAS_SQL = os.path.join(_DIRETORIO_ALGORITMOS, 'SQL', 'Queries_Analise_Dados')
+
+
+def gerar_dados(linhas: int, semente: int = SEMENTE_PADRAO) -> pd.DataFrame:
+    """
+    Gera um conjunto de vendas determinístico no formato de dados_cleaned.csv.
+
+    Args:
+        linhas (int): Número de linhas.
+        semente (int): Semente do gerador aleatório; a mesma semente gera sempre os mesmos dados.
+
+    Returns:
+        pd.DataFrame: Colunas 'data', 'id_marca_', 'vendas', 'valor_do_veiculo', 'nome' e 'marca',
+        todas como texto, com PROPORCAO_INVALIDAS das linhas inválidas.
+    """
+    rng = np.random.default_rng(semente)
+    ids = rng.integers(1, len(_CATALOGO) + 1, linhas)
+    sorteio = rng.random(linhas)
+
+    nomes = np.empty(linhas, dtype=object)
+    valores = np.empty(linhas, dtype=np.int64)
+    for id_marca, (modelos, (minimo, maximo)) in _CATALOGO.items():
+        linhas_marca = np.flatnonzero(ids == id_marca)
+        nomes[linhas_marca] = np.array(modelos, dtype=object)[(sorteio[linhas_marca] * len(modelos)).astype(int)]
+        valores[linhas_marca] = rng.integers(minimo // 1000, maximo // 1000 + 1, len(linhas_marca)) * 1000
+
+    dados = pd.DataFrame({
+        'data': (pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 730, linhas), unit='D')).strftime('%Y-%m-%d'),
+        'id_marca_': ids.astype(str),
+        'vendas': rng.integers(1, 60, linhas).astype(str),
+        'valor_do_veiculo': valores.astype(str),
+        'nome': nomes,
+        'marca': pd.Series(ids).map(MARCAS_CONHECIDAS).to_numpy(dtype=object),
+    })
+
+    invalidas = rng.choice(linhas, int(linhas * PROPORCAO_INVALIDAS), replace=False)
+    dados.loc[invalidas, 'vendas'] = '-1'
+    return dados
+
+
+def _carregar_modulo(caminho_relativo: str):
+    """
+    Importa um script de Querys/ (ou da raiz de Algoritmos) pelo caminho do arquivo.
+    """
+    caminho = os.path.join(_DIRETORIO_ALGORITMOS, caminho_relativo)
+    nome = 'desempenho_' + os.path.splitext(os.path.basename(caminho))[0]
+    especificacao = importlib.util.spec_from_file_location(nome, caminho)
+    modulo = importlib.util.module_from_spec(especificacao)
+    especificacao.loader.exec_module(modulo)
+    return modulo
+
+
+def _instanciar_com_dados(classe, **atributos):
+    """
+    Cria uma instância de uma classe de relatório já com os dados em memória, sem a leitura do
+    arquivo feita pelo construtor, para que a etapa meça apenas o cálculo.
+    """
+    objeto = classe.__new__(classe)
+    objeto.__dict__.update(atributos)
+    return objeto
+
+
+def _carregar_sql(dados: pd.DataFrame) -> sqlite3.Connection:
+    """
+    Cria a tabela dados_gerais (SQL/dados_gerais.sql) em um SQLite em memória e insere as linhas.
+    """
+    conexao = sqlite3.connect(':memory:')
+    with open(_ARQUIVO_ESQUEMA_SQL, encoding='utf-8') as arquivo:
+        conexao.executescript(arquivo.read())
+    registros = zip(dados['data'].dt.strftime('%Y-%m-%d'), dados['id_marca_'].tolist(), dados['vendas'].tolist(),
+                    dados['valor_do_veiculo'].tolist(), dados['nome'], dados['marca'])
+    conexao.executemany('INSERT INTO dados_gerais (data, id_marca, vendas, valor_do_veiculo, nome, marca) '
+                        'VALUES (?, ?, ?, ?, ?, ?)', registros)
+    conexao.commit()
+    return conexao
+
+
+def _executar_consultas_sql(conexao: sqlite3.Connection) -> None:
+    """
+    Executa as consultas de SQL/Queries_Analise_Dados.
+    """
+    for nome in sorted(os.listdir(_DIRETORIO_CONSULTAS_SQL)):
+        with open(os.path.join(_DIRETORIO_CONSULTAS_SQL, nome), encoding='utf-8') as arquivo:
+            conexao.execute(arquivo.read()).fetchall()
+
+
+def _montar_etapas(caminho_dados: str, diretorio: str) -> dict:
+    """
+    Monta as etapas medidas sobre um arquivo de dados gerado.
+
+    Returns:
+        dict: Nome da etapa -> função sem argumentos que executa a etapa uma vez.
+    """
+    query1 = _carregar_modulo(os.path.join('Querys', 'query1.py'))
+    query2 = _carregar_modulo(os.path.join('Querys', 'query2.py'))
+    query3 = _carregar_modulo(os.path.join('Querys', 'Query3.py'))
+    top10 = _carregar_modulo(os.path.join('Querys', 'Query5', 'Tabela_Mais_Vendidos.py'))
+    correlacao = _carregar_modulo(os.path.join('Querys', 'Query5', 'Matriz_De_Correlacao.py'))
+    popularidade = _carregar_modulo(os.path.join('Querys', 'Query5', 'Investiga_popularidade_marcas.py'))
+    receita = _carregar_modulo('receita.py')
+
+    caminho_quarentena = os.path.join(diretorio, 'quarentena.csv')
+    dados = carregar_dados_validados(caminho_dados, caminho_quarentena)
+
+    # As classes codificam as chaves uma vez, na carga; essa codificação é medida na etapa
+    # 'codificacao' e as etapas calcular_* medem só as agregações sobre os códigos prontos
+    grafico_vendas = _instanciar_com_dados(query1.GraficoVendas, dados=dados, codificados=agregacoes.codificar(dados))
+    tabela_receita = _instanciar_com_dados(query2.TabelaReceita, caminho_dados=caminho_dados, dados=dados,
+                                           codificados=agregacoes.codificar(dados))
+    media_vendas = _instanciar_com_dados(query3.MediaVendasPorMarca, file_path=caminho_dados, df=dados,
+                                         codificados=agregacoes.codificar(dados))
+    matriz = correlacao.MatrizCorrelacaoPlotter(caminho_dados, ['vendas', 'valor_do_veiculo'])
+    plotter_receita = receita.TabelaReceitaPlotter(caminho_dados)
+    receita_por_marca = plotter_receita.calcular_receita_por_marca(dados)
+    tabela_receita_por_venda = plotter_receita.criar_tabela_df(dados, receita_por_marca)
+    conexao = _carregar_sql(dados)
+
+    return {
+        'carga_validada': lambda: carregar_dados_validados(caminho_dados, caminho_quarentena),
+        'codificacao': lambda: [agregacoes.DadosCodificados(dados).codigos(chave)
+                                for chave in ('marca', 'nome', 'mes')],
+        'calcular_vendas_por_marca': grafico_vendas.calcular_vendas_por_marca,
+        'calcular_receita': tabela_receita.calcular_receita,
+        'calcular_media_ponderada': media_vendas.calcular_media_ponderada,
+        'calcular_resumo_por_marca': lambda: agregacoes.resumo_por_marca(dados),
+        'calcular_top_10_veiculos': lambda: top10.TabelaTop10Veiculos(dados),
+        'calcular_matriz_correlacao': lambda: matriz.calcular_matriz_correlacao(dados),
+        'calcular_serie_marca_mes': lambda: agregacoes.serie_marca_mes(dados),
+        'calcular_preco_medio_por_marca': lambda: popularidade.calcular_preco_medio_por_marca(dados),
+        'calcular_receita_por_marca': lambda: plotter_receita.calcular_receita_por_marca(dados),
+        'criar_tabela_receita': lambda: plotter_receita.criar_tabela_df(dados, receita_por_marca),
+        'carga_sql': lambda: _carregar_sql(dados).close(),
+        'consultas_sql': lambda: _executar_consultas_sql(conexao),
+        'exportacao_csv': lambda: exportar_tabela(tabela_receita_por_venda, os.path.join(diretorio, 'receita.csv')),
+        'exportacao_html': lambda: exportar_tabela(tabela_receita_por_venda, os.path.join(diretorio, 'receita.html'),
+                                                   titulo='Receita por Venda',
+                                                   formatadores={'Valor/Veículo': '{:,.2f}', 'Receita': '{:,.2f}'}),
+    }
+
+
+def medir(funcao, repeticoes: int = REPETICOES_PADRAO) -> dict:
+    """
+    Mede o tempo e o pico de memória de uma função.
+
+    A função é executada uma vez para aquecimento, `repeticoes` vezes cronometradas e uma última
+    vez com o tracemalloc ativo (que desacelera a execução, por isso fica fora do cronômetro).
+
+    Args:
+        funcao (callable): Função sem argumentos.
+        repeticoes (int): Número de execuções cronometradas.
+
+    Returns:
+        dict: 'tempo_mediano_s', 'tempo_minimo_s' e 'pico_memoria_bytes'.
+    """
+    # As mensagens impressas pelas etapas (ex.: linhas em quarentena) se repetiriam a cada execução
+    with open(os.devnull, 'w') as saida, contextlib.redirect_stdout(saida):
+        funcao()
+        tempos = []
+        for _ in range(repeticoes):
+            gc.collect()
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            funcao()
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {'tempo_mediano_s': statistics.median(tempos), 'tempo_minimo_s': min(tempos), 'pico_memoria_bytes': pico}
+
+
+def _ambiente() -> dict:
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'processador': platform.machine(),
+    }
+
+
+def executar_benchmark(linhas: int, repeticoes: int = REPETICOES_PADRAO, semente: int = SEMENTE_PADRAO,
+                       etapas: list = None) -> dict:
+    """
+    Executa as etapas medidas sobre um conjunto gerado com `linhas` linhas.
+
+    Args:
+        linhas (int): Tamanho do conjunto gerado.
+        repeticoes (int): Número de execuções cronometradas por etapa.
+        semente (int): Semente dos dados gerados.
+        etapas (list, optional): Nomes das etapas a medir. Mede todas se omitido.
+
+    Returns:
+        dict: 'linhas', 'semente', 'repeticoes', 'ambiente' e as medidas de cada etapa em 'etapas'.
+    """
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_dados = os.path.join(diretorio, 'dados.csv')
+        gerar_dados(linhas, semente).to_csv(caminho_dados, index=False)
+        with open(os.devnull, 'w') as saida, contextlib.redirect_stdout(saida):
+            funcoes = _montar_etapas(caminho_dados, diretorio)
+
+        desconhecidas = set(etapas or []) - set(funcoes)
+        if desconhecidas:
+            raise ValueError(f'Etapas desconhecidas: {sorted(desconhecidas)}. Use uma de {list(funcoes)}.')
+
+        medidas = {}
+        for nome, funcao in funcoes.items():
+            if etapas is None or nome in etapas:
+                medidas[nome] = medir(funcao, repeticoes)
+
+    return {'linhas': linhas, 'semente': semente, 'repeticoes': repeticoes, 'ambiente': _ambiente(), 'etapas': medidas}
+
+
+def caminho_linha_de_base(linhas: int, diretorio: str = DIRETORIO_LINHAS_DE_BASE) -> str:
+    """
+    Caminho do arquivo de linha de base de um tamanho: `<diretorio>/linha_de_base_<linhas>.json`.
+    """
+    return os.path.join(diretorio, f'linha_de_base_{linhas}.json')
+
+
+def gravar_linha_de_base(resultado: dict, diretorio: str = DIRETORIO_LINHAS_DE_BASE) -> str:
+    """
+    Grava o resultado de executar_benchmark como linha de base do seu tamanho.
+
+    Returns:
+        str: Caminho do arquivo gravado.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = caminho_linha_de_base(resultado['linhas'], diretorio)
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, indent=2)
+        arquivo.write('\n')
+    os.replace(caminho + '.tmp', caminho)
+    return caminho
+
+
+def ler_linha_de_base(linhas: int, diretorio: str = DIRETORIO_LINHAS_DE_BASE) -> dict:
+    """
+    Lê a linha de base de um tamanho, ou None se ela ainda não foi gravada.
+    """
+    caminho = caminho_linha_de_base(linhas, diretorio)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+# Ordem em que as situações das métricas de uma etapa prevalecem na tabela
+_PRIORIDADE_SITUACAO = ['REGRESSAO', 'removida', 'nova', 'melhora', 'ok']
+
+
+def _situacao(base: float, atual: float, tolerancia: float, folga: float) -> str:
+    if atual > base * (1 + tolerancia) + folga:
+        return 'REGRESSAO'
+    if atual < base * (1 - tolerancia) - folga:
+        return 'melhora'
+    return 'ok'
+
+
+def comparar(linha_de_base: dict, resultado: dict, tolerancia_tempo: float = TOLERANCIA_TEMPO_PADRAO,
+             tolerancia_memoria: float = TOLERANCIA_MEMORIA_PADRAO, folga_tempo: float = FOLGA_TEMPO_PADRAO,
+             folga_memoria: int = FOLGA_MEMORIA_PADRAO) -> pd.DataFrame:
+    """
+    Compara um resultado de executar_benchmark com a linha de base do mesmo tamanho.
+
+    Args:
+        linha_de_base (dict): Resultado gravado por gravar_linha_de_base.
+        resultado (dict): Resultado atual.
+        tolerancia_tempo (float): Aumento relativo do tempo mediano aceito (0.5 = 50%).
+        tolerancia_memoria (float): Aumento relativo do pico de memória aceito.
+        folga_tempo (float): Aumento absoluto do tempo, em segundos, sempre aceito.
+        folga_memoria (int): Aumento absoluto do pico de memória, em bytes, sempre aceito.
+
+    Returns:
+        pd.DataFrame: Uma linha por etapa e métrica, com 'etapa', 'metrica', 'base', 'atual',
+        'variacao' (relativa) e 'situacao' ('ok', 'melhora', 'REGRESSAO', 'nova' ou 'removida').
+    """
+    metricas = [('tempo_mediano_s', tolerancia_tempo, folga_tempo),
+                ('pico_memoria_bytes', tolerancia_memoria, folga_memoria)]
+    etapas_base = linha_de_base['etapas']
+    etapas_atuais = resultado['etapas']
+
+    linhas = []
+    for etapa in list(etapas_atuais) + [etapa for etapa in etapas_base if etapa not in etapas_atuais]:
+        for metrica, tolerancia, folga in metricas:
+            base = etapas_base.get(etapa, {}).get(metrica)
+            atual = etapas_atuais.get(etapa, {}).get(metrica)
+            if base is None:
+                situacao = 'nova'
+            elif atual is None:
+                situacao = 'removida'
+            else:
+                situacao = _situacao(base, atual, tolerancia, folga)
+            variacao = (atual - base) / base if base and atual is not None else np.nan
+            linhas.append({'etapa': etapa, 'metrica': metrica, 'base': base, 'atual': atual,
+                           'variacao': variacao, 'situacao': situacao})
+    return pd.DataFrame(linhas, columns=['etapa', 'metrica', 'base', 'atual', 'variacao', 'situacao'])
+
+
+def confirmar_regressoes(linha_de_base: dict, resultado: dict, tentativas: int = TENTATIVAS_PADRAO,
+                         **tolerancias) -> pd.DataFrame:
+    """
+    Compara o resultado com a linha de base, medindo de novo as etapas que regrediram.
+
+    Cada nova medição de uma etapa que regrediu substitui a anterior no que ela tiver de melhor
+    (menor tempo, menor pico de memória); só continua como regressão o que se repetir em todas
+    as `tentativas`.
+
+    Args:
+        linha_de_base (dict): Resultado gravado por gravar_linha_de_base.
+        resultado (dict): Resultado atual de executar_benchmark; as medidas remedidas são atualizadas nele.
+        tentativas (int): Número máximo de medições de cada etapa.
+        **tolerancias: Tolerâncias e folgas repassadas a `comparar`.
+
+    Returns:
+        pd.DataFrame: A comparação final, como em `comparar`.
+    """
+    comparacao = comparar(linha_de_base, resultado, **tolerancias)
+    for _ in range(tentativas - 1):
+        regredidas = comparacao.loc[comparacao['situacao'] == 'REGRESSAO', 'etapa'].unique().tolist()
+        if not regredidas:
+            break
+        novo = executar_benchmark(resultado['linhas'], resultado['repeticoes'], resultado['semente'], regredidas)
+        for etapa in regredidas:
+            anteriores = resultado['etapas'][etapa]
+            resultado['etapas'][etapa] = {metrica: min(valor, novo['etapas'][etapa][metrica])
+                                          for metrica, valor in anteriores.items()}
+        comparacao = comparar(linha_de_base, resultado, **tolerancias)
+    return comparacao
+
+
+def formatar_comparacao(comparacao: pd.DataFrame) -> str:
+    """
+    Formata o resultado de `comparar` como uma tabela de texto, uma linha por etapa.
+    """
+    def tempo(valor):
+        return '-' if valor is None or pd.isna(valor) else f'{valor * 1000:,.1f} ms'
+
+    def memoria(valor):
+        return '-' if valor is None or pd.isna(valor) else f'{valor / 1024 / 1024:,.1f} MiB'
+
+    def variacao(valor):
+        return '-' if pd.isna(valor) else f'{valor:+.1%}'
+
+    linhas = []
+    for etapa, grupo in comparacao.groupby('etapa', sort=False):
+        medidas = grupo.set_index('metrica')
+        t = medidas.loc['tempo_mediano_s']
+        m = medidas.loc['pico_memoria_bytes']
+        linhas.append({
+            'etapa': etapa,
+            'tempo base': tempo(t['base']), 'tempo atual': tempo(t['atual']), 'Δ tempo': variacao(t['variacao']),
+            'memória base': memoria(m['base']), 'memória atual': memoria(m['atual']), 'Δ memória': variacao(m['variacao']),
+            'situação': min(t['situacao'], m['situacao'], key=_PRIORIDADE_SITUACAO.index),
+        })
+    return pd.DataFrame(linhas).to_string(index=False)
@@ -0,0 +1,342 @@
+import html
+import os
+
+import numpy as np
+import pandas as pd
+
+from relatorios.cache_renderizacao import exibir_imagem
+
+FORMATOS_SUPORTADOS = ('csv', 'jsonl', 'parquet', 'html', 'png')
+
+# Acima deste número de linhas a tabela deixa de ser legível como imagem e o custo de
+# desenhar célula por célula no matplotlib passa a dominar o tempo do relatório.
+LIMITE_LINHAS_PNG = 50
+
+TAMANHO_BLOCO_PADRAO = 50_000
+
+_EXTENSOES = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.parquet': 'parquet',
+    '.html': 'html',
+    '.htm': 'html',
+    '.png': 'png',
+}
+
+CSS_TABELA = """
+body { font-family: "Segoe UI", Arial, sans-serif; margin: 24px; color: #333; }
+h1 { font-size: 18px; font-weight: 600; }
+table { border-collapse: collapse; font-size: 13px; }
+th { background: #606c88; color: #fff; padding: 6px 12px; position: sticky; top: 0; }
+td { padding: 4px 12px; border-bottom: 1px solid #fff; text-align: center; }
+td.num { text-align: right; font-variant-numeric: tabular-nums; }
+tbody tr:nth-child(3n+1) { background: #F0F0F0; }
+tbody tr:nth-child(3n+2) { background: #D9D9D9; }
+tbody tr:nth-child(3n) { background: #C0C0C0; }
+tfoot td { font-weight: 600; border-top: 2px solid #606c88; }
+"""
+
+
+def _inferir_formato(caminho: str) -> str:
+    """
+    Deduz o formato de exportação a partir da extensão do arquivo.
+
+    Args:
+        caminho (str): Caminho do arquivo de saída.
+
+    Returns:
+        str: Um dos valores de FORMATOS_SUPORTADOS.
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao not in _EXTENSOES:
+        raise ValueError(f'Não foi possível deduzir o formato do arquivo {caminho}. '
+                         f'Informe um dos formatos: {", ".join(FORMATOS_SUPORTADOS)}.')
+    return _EXTENSOES[extensao]
+
+
+def _iterar_blocos(tabela, tamanho_bloco: int):
+    """
+    Percorre a tabela em blocos de linhas consecutivas.
+
+    Args:
+        tabela (pd.DataFrame | Iterable[pd.DataFrame]): Tabela completa ou blocos já prontos
+            (por exemplo, o retorno de `pd.read_csv(..., chunksize=...)`).
+        tamanho_bloco (int): Número máximo de linhas por bloco quando `tabela` é um DataFrame.
+
+    Yields:
+        pd.DataFrame: Blocos da tabela, na ordem original.
+    """
+    if isinstance(tabela, pd.DataFrame):
+        if tabela.empty:
+            yield tabela
+            return
+        for inicio in range(0, len(tabela), tamanho_bloco):
+            yield tabela.iloc[inicio:inicio + tamanho_bloco]
+    else:
+        yield from tabela
+
+
+def _aplicar_formatadores(bloco: pd.DataFrame, formatadores) -> pd.DataFrame:
+    """
+    Aplica formatos de exibição (ex.: '{:,.2f}') às colunas indicadas.
+
+    Args:
+        bloco (pd.DataFrame): Bloco da tabela.
+        formatadores (dict | None): Mapeamento coluna -> string de formato.
+
+    Returns:
+        pd.DataFrame: Bloco com as colunas formatadas como texto.
+    """
+    if not formatadores:
+        return bloco
+    bloco = bloco.copy()
+    for coluna, formato in formatadores.items():
+        valores = bloco[coluna]
+        preenchidos = valores.notna()
+        bloco[coluna] = valores.astype(object)
+        bloco.loc[preenchidos, coluna] = valores[preenchidos].map(formato.format)
+        bloco.loc[~preenchidos, coluna] = ''
+    return bloco
+
+
+def _linha_rodape(colunas, rodape: dict) -> pd.DataFrame:
+    """
+    Monta a linha de rodapé (ex.: o total) com as colunas da tabela; as colunas sem valor ficam vazias.
+    """
+    desconhecidas = set(rodape) - set(colunas)
+    if desconhecidas:
+        raise ValueError(f'Colunas do rodapé fora da tabela: {sorted(desconhecidas)}.')
+    return pd.DataFrame([[rodape.get(coluna) for coluna in colunas]], columns=list(colunas), dtype=object)
+
+
+def _escapar_html(serie: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna para texto HTML seguro usando operações vetorizadas de string.
+    """
+    texto = serie.astype(str).where(serie.notna(), '')
+    return (texto.str.replace('&', '&amp;', regex=False)
+                 .str.replace('<', '&lt;', regex=False)
+                 .str.replace('>', '&gt;', regex=False))
+
+
+def _exportar_csv(blocos, caminho: str) -> None:
+    with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+        for numero, bloco in enumerate(blocos):
+            bloco.to_csv(arquivo, index=False, header=numero == 0)
+
+
+def _exportar_jsonl(blocos, caminho: str) -> None:
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        for bloco in blocos:
+            if bloco.empty:
+                continue
+            linhas = bloco.to_json(orient='records', lines=True, force_ascii=False, date_format='iso')
+            arquivo.write(linhas if linhas.endswith('\n') else linhas + '\n')
+
+
+def _exportar_parquet(blocos, caminho: str) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as erro:
+        raise ImportError('A exportação em Parquet requer o pacote pyarrow (pip install pyarrow).') from erro
+
+    escritor = None
+    try:
+        for bloco in blocos:
+            tabela_arrow = pa.Table.from_pandas(bloco, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(caminho, tabela_arrow.schema)
+            else:
+                tabela_arrow = tabela_arrow.cast(escritor.schema)
+            escritor.write_table(tabela_arrow)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def _linhas_html(bloco: pd.DataFrame, classes: list, formatadores) -> pd.Series:
+    """
+    Monta o HTML de todas as linhas do bloco concatenando colunas inteiras, sem iterar linha a linha.
+    """
+    bloco = _aplicar_formatadores(bloco, formatadores)
+    linhas = pd.Series('<tr>', index=bloco.index)
+    for abertura, coluna in zip(classes, bloco.columns):
+        linhas = linhas + abertura + _escapar_html(bloco[coluna]) + '</td>'
+    return linhas + '</tr>'
+
+
+def _exportar_html(blocos, caminho: str, titulo, formatadores, rodape=None) -> None:
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        arquivo.write('<!DOCTYPE html>\n<html lang="pt-BR">\n<head>\n<meta charset="utf-8">\n')
+        titulo = html.escape(titulo) if titulo else None
+        arquivo.write(f'<title>{titulo or "Tabela"}</title>\n<style>{CSS_TABELA}</style>\n</head>\n<body>\n')
+        if titulo:
+            arquivo.write(f'<h1>{titulo}</h1>\n')
+        arquivo.write('<table>\n')
+
+        colunas = classes = None
+        for bloco in blocos:
+            if colunas is None:
+                colunas = list(bloco.columns)
+                classes = ['<td class="num">' if pd.api.types.is_numeric_dtype(bloco[coluna]) else '<td>'
+                           for coluna in colunas]
+                cabecalho = ''.join(f'<th>{html.escape(str(coluna))}</th>' for coluna in colunas)
+                arquivo.write(f'<thead><tr>{cabecalho}</tr></thead>\n<tbody>\n')
+            if bloco.empty:
+                continue
+            arquivo.write('\n'.join(_linhas_html(bloco, classes, formatadores)))
+            arquivo.write('\n')
+        arquivo.write('</tbody>\n')
+
+        if rodape and colunas is not None:
+            linha = _linhas_html(_linha_rodape(colunas, rodape), classes, formatadores).iloc[0]
+            arquivo.write(f'<tfoot>{linha}</tfoot>\n')
+        arquivo.write('</table>\n</body>\n</html>\n')
+
+
+def renderizar_tabela_png(tabela: pd.DataFrame, caminho: str, titulo: str = None,
+                          destacar_primeira_coluna: bool = False, tamanho_fonte: int = 10,
+                          figsize: tuple = None, limite_linhas: int = LIMITE_LINHAS_PNG, cache=None):
+    """
+    Desenha uma tabela pequena como imagem PNG com o estilo cinza usado nos relatórios.
+
+    As cores de cada célula são calculadas de uma vez e passadas ao matplotlib, em vez de
+    reestilizar `table._cells` em um laço Python depois de a tabela ser criada. Com um `cache`,
+    a imagem só é desenhada se a tabela ou o estilo mudaram desde a última execução.
+
+    Args:
+        tabela (pd.DataFrame): Tabela de resumo a ser desenhada.
+        caminho (str): Caminho do arquivo PNG de saída.
+        titulo (str, optional): Título exibido acima da tabela.
+        destacar_primeira_coluna (bool): Se True, pinta a primeira coluna com a cor do cabeçalho.
+        tamanho_fonte (int): Tamanho da fonte das células.
+        figsize (tuple, optional): Tamanho da figura. Calculado pelo número de linhas se omitido.
+        limite_linhas (int): Número máximo de linhas aceito para renderização.
+        cache (CacheRenderizacao, optional): Cache de imagens a ser consultado antes de desenhar.
+
+    Returns:
+        matplotlib.figure.Figure: A figura gerada, para exibição opcional com plt.show(). Se a
+        imagem foi reaproveitada do cache, a figura apenas mostra o arquivo gravado.
+    """
+    if len(tabela) > limite_linhas:
+        raise ValueError(f'A tabela tem {len(tabela)} linhas; a renderização em PNG é limitada a '
+                         f'{limite_linhas}. Exporte em CSV, JSONL, Parquet ou HTML.')
+
+    if cache is None:
+        return _desenhar_tabela_png(tabela, caminho, titulo, destacar_primeira_coluna, tamanho_fonte, figsize)
+
+    figuras = []
+    especificacao = {
+        'tipo': 'tabela',
+        'titulo': titulo,
+        'destacar_primeira_coluna': destacar_primeira_coluna,
+        'tamanho_fonte': tamanho_fonte,
+        'figsize': figsize,
+    }
+    cache.obter_ou_renderizar(
+        tabela, especificacao,
+        lambda saida: figuras.append(_desenhar_tabela_png(tabela, saida, titulo, destacar_primeira_coluna,
+                                                          tamanho_fonte, figsize)),
+        caminho)
+    return figuras[0] if figuras else exibir_imagem(caminho, figsize)
+
+
+def _desenhar_tabela_png(tabela: pd.DataFrame, caminho: str, titulo, destacar_primeira_coluna: bool,
+                         tamanho_fonte: int, figsize):
+    import matplotlib.pyplot as plt
+
+    num_linhas, num_colunas = tabela.shape
+    if num_colunas == 0:
+        raise ValueError('A tabela não tem colunas para desenhar.')
+    cor_destaque = '#606c88'
+    listras = np.array(['#F0F0F0', '#D9D9D9', '#C0C0C0'])
+    cores = np.repeat(listras[np.arange(num_linhas) % len(listras)][:, None], num_colunas, axis=1)
+    if destacar_primeira_coluna and num_colunas:
+        cores[:, 0] = cor_destaque
+
+    if figsize is None:
+        figsize = (max(8, 2.2 * num_colunas), max(2, 0.25 * (num_linhas + 1)))
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.axis('off')
+
+    if num_linhas:
+        texto = tabela.astype(str).where(tabela.notna(), '').to_numpy()
+        tbl = ax.table(cellText=texto.tolist(), cellColours=cores.tolist(), colLabels=list(tabela.columns),
+                       colColours=[cor_destaque] * num_colunas, cellLoc='center', loc='center')
+    else:
+        # O matplotlib não monta uma tabela sem células; sem linhas, o cabeçalho é a única linha desenhada
+        tbl = ax.table(cellText=[[str(coluna) for coluna in tabela.columns]],
+                       cellColours=[[cor_destaque] * num_colunas], cellLoc='center', loc='center')
+    tbl.auto_set_font_size(False)
+    tbl.set_fontsize(tamanho_fonte)
+    tbl.auto_set_column_width(list(range(num_colunas)))
+    tbl.scale(1.2, 1.2)
+
+    # Apenas o cabeçalho (e a coluna destacada) precisam de texto branco
+    for coluna in range(num_colunas):
+        tbl[0, coluna].get_text().set_color('white')
+    if destacar_primeira_coluna:
+        for linha in range(1, num_linhas + 1):
+            tbl[linha, 0].get_text().set_color('white')
+
+    if titulo:
+        ax.set_title(titulo)
+
+    fig.savefig(caminho, bbox_inches='tight', pad_inches=0.05)
+    return fig
+
+
+def exportar_tabela(tabela, caminho: str, formato: str = None, tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+                    titulo: str = None, formatadores: dict = None, cache=None, rodape: dict = None) -> str:
+    """
+    Exporta uma tabela de relatório para CSV, JSON Lines, Parquet, HTML estático ou PNG.
+
+    Os formatos tabulares são gravados em blocos, sem percorrer a tabela linha a linha, e aceitam
+    tanto um DataFrame quanto um iterável de DataFrames. O PNG é reservado para tabelas de resumo
+    pequenas (ver LIMITE_LINHAS_PNG).
+
+    Linhas de apresentação, como o total, vão em `rodape` e só aparecem no HTML (em `<tfoot>`) e
+    no PNG; os formatos tabulares recebem apenas as linhas de dados, com os tipos originais.
+
+    Args:
+        tabela (pd.DataFrame | Iterable[pd.DataFrame]): Tabela a ser exportada.
+        caminho (str): Caminho do arquivo de saída.
+        formato (str, optional): Formato de saída. Deduzido pela extensão se omitido.
+        tamanho_bloco (int): Número de linhas gravadas por vez.
+        titulo (str, optional): Título usado nas saídas HTML e PNG.
+        formatadores (dict, optional): Formatos de exibição por coluna, usados no HTML (ex.: {'Receita (R$)': '{:,.2f}'}).
+        cache (CacheRenderizacao, optional): Cache de imagens consultado na saída PNG.
+        rodape (dict, optional): Valores da linha de rodapé por coluna (ex.: {'Receita': 1000.0}),
+            exibida no HTML e no PNG.
+
+    Returns:
+        str: O caminho do arquivo gerado.
+    """
+    formato = (formato or _inferir_formato(caminho)).lower()
+    if formato not in FORMATOS_SUPORTADOS:
+        raise ValueError(f'Formato {formato!r} não suportado. Use um dos formatos: {", ".join(FORMATOS_SUPORTADOS)}.')
+
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+
+    if formato == 'png':
+        if not isinstance(tabela, pd.DataFrame):
+            tabela = pd.concat(list(tabela), ignore_index=True)
+        if rodape:
+            # object evita que as colunas inteiras virem float por causa das células vazias do rodapé
+            tabela = pd.concat([tabela.astype(object), _linha_rodape(tabela.columns, rodape)], ignore_index=True)
+        renderizar_tabela_png(_aplicar_formatadores(tabela, formatadores), caminho, titulo=titulo, cache=cache)
+        return caminho
+
+    blocos = _iterar_blocos(tabela, tamanho_bloco)
+    if formato == 'csv':
+        _exportar_csv(blocos, caminho)
+    elif formato == 'jsonl':
+        _exportar_jsonl(blocos, caminho)
+    elif formato == 'parquet':
+        _exportar_parquet(blocos, caminho)
+    else:
+        _exportar_html(blocos, caminho, titulo, formatadores, rodape)
+    return caminho
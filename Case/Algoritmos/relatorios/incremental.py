@@ -0,0 +1,310 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from relatorios import agregacoes
+from relatorios.exportacao import TAMANHO_BLOCO_PADRAO
+from relatorios.particionamento import anexar_particoes, gravar_assinatura_particoes, ler_assinatura_particoes
+from relatorios.validacao import (
+    COLUNAS,
+    assinatura_arquivo,
+    caminho_quarentena_anexos,
+    iterar_blocos_validados,
+    validar_bloco,
+)
+
+# Colunas cujos co-momentos são mantidos para a matriz de correlação (MatrizCorrelacaoPlotter)
+COLUNAS_CORRELACAO = ['vendas', 'valor_do_veiculo']
+
+# Totais mantidos por chave e as colunas de cada um
+_TOTAIS = {
+    'marca': ['contagem', 'vendas', 'valor_do_veiculo'],
+    'nome': ['vendas', 'receita'],
+    'marca_mes': ['contagem', 'vendas', 'valor_do_veiculo'],
+}
+
+# Relatório -> (função que monta a tabela, totais de que ela precisa)
+_MONTADORES = {
+    'vendas_por_marca': (agregacoes.montar_vendas_por_marca, 'marca'),
+    'receita_por_veiculo': (agregacoes.montar_receita_por_veiculo, 'nome'),
+    'media_ponderada_por_marca': (agregacoes.montar_media_ponderada_por_marca, 'marca'),
+    'media_vendas_por_marca': (agregacoes.montar_media_vendas_por_marca, 'marca'),
+    'top_veiculos': (agregacoes.montar_top_veiculos, 'nome'),
+    'resumo_por_marca': (agregacoes.montar_resumo_por_marca, 'marca'),
+    'serie_marca_mes': (agregacoes.montar_serie_marca_mes, 'marca_mes'),
+}
+
+_TIPOS_TOTAIS = {
+    'contagem': 'int64',
+    'vendas': 'int64',
+    'valor_do_veiculo': 'float64',
+    'receita': 'float64',
+}
+
+
+def _totais_vazios(chave: str) -> pd.DataFrame:
+    """
+    Tabela de totais sem nenhuma categoria, com as colunas e tipos de `chave`.
+    """
+    if chave == 'marca_mes':
+        indice = pd.MultiIndex.from_arrays([np.empty(0, dtype=object), np.empty(0, dtype=np.int64)],
+                                           names=['marca', 'mes'])
+    else:
+        indice = pd.Index(np.empty(0, dtype=object), name=chave)
+    return pd.DataFrame({coluna: pd.Series(dtype=_TIPOS_TOTAIS[coluna]) for coluna in _TOTAIS[chave]}).set_index(indice)
+
+
+def _somar_totais(atual: pd.DataFrame, novo: pd.DataFrame) -> pd.DataFrame:
+    """
+    Soma dois conjuntos de totais por chave, mantendo as chaves em ordem crescente.
+    """
+    if atual.empty:
+        return novo
+    if novo.empty:
+        return atual
+    soma = atual.add(novo, fill_value=0).sort_index()
+    return soma.astype({coluna: _TIPOS_TOTAIS[coluna] for coluna in soma.columns})
+
+
+class AgregadosIncrementais:
+    """
+    Agregados dos relatórios mantidos em memória e atualizados apenas com as linhas novas.
+
+    Guarda os totais por marca, por veículo e por marca/mês e os co-momentos de
+    COLUNAS_CORRELACAO (contagem, médias e somas dos produtos centrados). Incorporar um bloco
+    custa O(linhas do bloco): o bloco é agregado sozinho e os totais são somados aos atuais,
+    e os co-momentos são combinados pela fórmula de Chan et al. As tabelas dos relatórios são
+    montadas pelas mesmas funções de agregacoes.py, então coincidem com o cálculo sobre o
+    conjunto completo (a menos de arredondamento nas somas de ponto flutuante).
+
+    Attributes:
+        total_linhas (int): Número de linhas incorporadas.
+        assinatura (dict | None): assinatura_arquivo do arquivo de dados na última vez em que os
+            agregados foram construídos ou receberam linhas dele.
+    """
+
+    def __init__(self):
+        """
+        Inicializa agregados vazios.
+        """
+        self._totais = {chave: _totais_vazios(chave) for chave in _TOTAIS}
+        self._n = 0
+        self._medias = np.zeros(len(COLUNAS_CORRELACAO))
+        self._comomentos = np.zeros((len(COLUNAS_CORRELACAO), len(COLUNAS_CORRELACAO)))
+        self.assinatura = None
+
+    @property
+    def total_linhas(self) -> int:
+        return self._n
+
+    @classmethod
+    def construir(cls, caminho_arquivo: str, tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> 'AgregadosIncrementais':
+        """
+        Reconstrói os agregados do zero a partir do arquivo de dados, lendo-o em blocos validados.
+
+        Args:
+            caminho_arquivo (str): Caminho do arquivo de dados.
+            tamanho_bloco (int): Número de linhas lidas por vez.
+
+        Returns:
+            AgregadosIncrementais: Os agregados do arquivo inteiro.
+        """
+        agregados = cls()
+        # Lida antes da leitura: se o arquivo mudar durante ela, a assinatura não vai conferir
+        agregados.assinatura = assinatura_arquivo(caminho_arquivo)
+        for bloco in iterar_blocos_validados(caminho_arquivo, tamanho_bloco=tamanho_bloco):
+            agregados.atualizar(bloco)
+        return agregados
+
+    def atualizar(self, dados: pd.DataFrame) -> None:
+        """
+        Incorpora linhas já validadas (ver validacao.py) aos agregados.
+
+        Args:
+            dados (pd.DataFrame): Linhas novas.
+        """
+        if dados.empty:
+            return
+        codificados = agregacoes.codificar(dados)
+        for chave in ('marca', 'nome'):
+            self._totais[chave] = _somar_totais(self._totais[chave],
+                                                agregacoes.totais_por_chave(codificados, chave, _TOTAIS[chave]))
+        self._totais['marca_mes'] = _somar_totais(self._totais['marca_mes'],
+                                                  agregacoes.totais_por_marca_mes(codificados))
+
+        # Co-momentos do bloco, combinados com os atuais (Chan, Golub e LeVeque)
+        valores = dados[COLUNAS_CORRELACAO].to_numpy(dtype=np.float64)
+        n_bloco = len(valores)
+        medias_bloco = valores.mean(axis=0)
+        centrados = valores - medias_bloco
+        comomentos_bloco = centrados.T @ centrados
+
+        n_total = self._n + n_bloco
+        delta = medias_bloco - self._medias
+        self._comomentos = self._comomentos + comomentos_bloco + np.outer(delta, delta) * self._n * n_bloco / n_total
+        self._medias = self._medias + delta * n_bloco / n_total
+        self._n = n_total
+
+    def anexar(self, novas: pd.DataFrame, caminho_arquivo: str, caminho_quarentena: str = None,
+               diretorio_particoes: str = None, amostra=None) -> pd.DataFrame:
+        """
+        Valida linhas novas, anexa as válidas ao conjunto de dados e atualiza os agregados.
+
+        As linhas seguem o formato de dados_cleaned.csv. As rejeitadas são acrescentadas à
+        quarentena dos anexos, que acumula as rejeições de todas as execuções; as válidas são
+        acrescentadas ao fim de `caminho_arquivo` e, se informados, ao conjunto particionado e à
+        amostra estratificada.
+
+        Os agregados, as partições e a amostra precisam corresponder ao arquivo atual (mesma
+        assinatura_arquivo); caso contrário nada é gravado e um ValueError é lançado, já que as
+        linhas novas seriam somadas a um estado que não representa o arquivo.
+
+        Args:
+            novas (pd.DataFrame): Linhas novas, ainda não validadas.
+            caminho_arquivo (str): Arquivo CSV do conjunto de dados.
+            caminho_quarentena (str, optional): CSV de quarentena. Usa caminho_quarentena_anexos se omitido.
+            diretorio_particoes (str, optional): Diretório do conjunto particionado por ano/mês.
+            amostra (AmostraEstratificada, optional): Amostra a atualizar com as linhas válidas.
+
+        Returns:
+            pd.DataFrame: As linhas válidas anexadas. O número de linhas rejeitadas e o caminho da
+            quarentena ficam em `attrs['linhas_em_quarentena']` e `attrs['caminho_quarentena']`.
+
+        Raises:
+            ValueError: Se os agregados, as partições ou a amostra estão desatualizados.
+        """
+        assinatura = assinatura_arquivo(caminho_arquivo)
+        if self.assinatura != assinatura:
+            raise ValueError(f'Os agregados não correspondem a {caminho_arquivo}; reconstrua-os com construir.')
+        if diretorio_particoes is not None and ler_assinatura_particoes(diretorio_particoes) != assinatura:
+            raise ValueError(f'As partições em {diretorio_particoes} não correspondem a {caminho_arquivo}; '
+                             f'reconstrua-as com particionar_arquivo.')
+        if amostra is not None and amostra.assinatura != assinatura:
+            raise ValueError(f'A amostra não corresponde a {caminho_arquivo}; reconstrua-a com '
+                             f'AmostraEstratificada.construir.')
+
+        novas = novas.copy()
+        if 'data' in novas.columns and pd.api.types.is_datetime64_any_dtype(novas['data']):
+            # A validação espera as datas como texto AAAA-MM-DD, como no CSV
+            novas['data'] = novas['data'].dt.strftime('%Y-%m-%d')
+        validas, rejeitadas = validar_bloco(novas.astype(object))
+
+        caminho_quarentena = caminho_quarentena or caminho_quarentena_anexos(caminho_arquivo)
+        if not rejeitadas.empty:
+            novo = not os.path.exists(caminho_quarentena)
+            rejeitadas.to_csv(caminho_quarentena, mode='a', header=novo, index_label='linha')
+
+        if not validas.empty:
+            _anexar_csv(validas, caminho_arquivo)
+            assinatura = assinatura_arquivo(caminho_arquivo)
+            if diretorio_particoes is not None:
+                anexar_particoes(validas, diretorio_particoes)
+                gravar_assinatura_particoes(diretorio_particoes, assinatura)
+            if amostra is not None:
+                amostra.atualizar(validas)
+                amostra.assinatura = assinatura
+            self.atualizar(validas)
+            self.assinatura = assinatura
+
+        validas.attrs['linhas_em_quarentena'] = len(rejeitadas)
+        validas.attrs['caminho_quarentena'] = caminho_quarentena if len(rejeitadas) else None
+        return validas
+
+    def tabela(self, nome: str, **parametros) -> pd.DataFrame:
+        """
+        Tabela atual de um relatório de agregacoes.RELATORIOS (ou 'matriz_correlacao').
+
+        Args:
+            nome (str): Nome do relatório.
+            **parametros: Parâmetros do relatório (ex.: n para 'top_veiculos').
+
+        Returns:
+            pd.DataFrame: A mesma tabela que o relatório calcularia sobre todas as linhas incorporadas.
+        """
+        if nome == 'matriz_correlacao':
+            return self.calcular_matriz_correlacao()
+        if nome not in _MONTADORES:
+            raise ValueError(f"Relatório desconhecido: {nome}. Use um de {sorted(_MONTADORES) + ['matriz_correlacao']}.")
+        montar, chave = _MONTADORES[nome]
+        return montar(self._totais[chave], **parametros)
+
+    def calcular_matriz_correlacao(self) -> pd.DataFrame:
+        """
+        Matriz de correlação de Pearson entre COLUNAS_CORRELACAO, a partir dos co-momentos.
+
+        Returns:
+            pd.DataFrame: Matriz quadrada indexada pelas colunas, como `dados[COLUNAS_CORRELACAO].corr()`.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            desvios = np.sqrt(np.diag(self._comomentos))
+            correlacao = np.clip(self._comomentos / np.outer(desvios, desvios), -1.0, 1.0)
+        np.fill_diagonal(correlacao, np.where(desvios > 0, 1.0, np.nan))
+        return pd.DataFrame(correlacao, index=COLUNAS_CORRELACAO, columns=COLUNAS_CORRELACAO)
+
+    def salvar(self, caminho: str) -> None:
+        """
+        Grava os agregados em JSON.
+
+        Args:
+            caminho (str): Caminho do arquivo de estado.
+        """
+        estado = {
+            'linhas': self._n,
+            'assinatura': self.assinatura,
+            'medias': self._medias.tolist(),
+            'comomentos': self._comomentos.tolist(),
+            # tolist() devolve int/float do Python, que o json grava sem perda de precisão
+            'totais': {chave: {coluna: valores.tolist() for coluna, valores in totais.reset_index().items()}
+                       for chave, totais in self._totais.items()},
+        }
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        with open(caminho + '.tmp', 'w', encoding='utf-8') as arquivo:
+            json.dump(estado, arquivo, ensure_ascii=False)
+        os.replace(caminho + '.tmp', caminho)
+
+    @classmethod
+    def carregar(cls, caminho: str) -> 'AgregadosIncrementais':
+        """
+        Lê agregados gravados por `salvar`, prontos para novas atualizações.
+
+        Args:
+            caminho (str): Caminho do arquivo de estado.
+
+        Returns:
+            AgregadosIncrementais: Os agregados carregados.
+        """
+        with open(caminho, encoding='utf-8') as arquivo:
+            estado = json.load(arquivo)
+        agregados = cls()
+        agregados._n = int(estado['linhas'])
+        agregados.assinatura = estado.get('assinatura')
+        agregados._medias = np.array(estado['medias'], dtype=np.float64)
+        agregados._comomentos = np.array(estado['comomentos'], dtype=np.float64)
+        for chave, colunas in estado['totais'].items():
+            totais = pd.DataFrame(colunas)
+            if totais.empty:
+                continue
+            indice = ['marca', 'mes'] if chave == 'marca_mes' else [chave]
+            totais = totais.astype({coluna: _TIPOS_TOTAIS[coluna] for coluna in _TOTAIS[chave]})
+            agregados._totais[chave] = totais.set_index(indice)
+        return agregados
+
+
+def _anexar_csv(dados: pd.DataFrame, caminho_arquivo: str) -> None:
+    """
+    Acrescenta linhas validadas ao fim de um CSV no formato de dados_cleaned.csv.
+    """
+    novo = not os.path.exists(caminho_arquivo) or os.path.getsize(caminho_arquivo) == 0
+    if not novo:
+        # Garante que a primeira linha nova não seja colada à última linha do arquivo
+        with open(caminho_arquivo, 'rb') as arquivo:
+            arquivo.seek(-1, os.SEEK_END)
+            sem_quebra = arquivo.read(1) != b'\n'
+        if sem_quebra:
+            with open(caminho_arquivo, 'a', encoding='utf-8') as arquivo:
+                arquivo.write('\n')
+    dados[COLUNAS].to_csv(caminho_arquivo, mode='a', header=novo, index=False, date_format='%Y-%m-%d')
@@ -0,0 +1,350 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from relatorios.agregacoes import RELATORIOS
+from relatorios.exportacao import TAMANHO_BLOCO_PADRAO
+from relatorios.validacao import COLUNAS, assinatura_arquivo, iterar_blocos_validados
+
+ARQUIVO_ESTATISTICAS = 'estatisticas.json'
+ARQUIVO_ASSINATURA = 'assinatura.json'
+ARQUIVO_PARTICAO = 'dados.csv'
+
+_TIPOS_PARTICAO = {
+    'id_marca_': 'int64',
+    'vendas': 'int64',
+    'valor_do_veiculo': 'float64',
+    'nome': object,
+    'marca': object,
+}
+
+
+def _chave_particao(ano: int, mes: int) -> str:
+    """
+    Caminho relativo da partição de um mês: `ano=AAAA/mes=MM`.
+    """
+    return f'ano={ano:04d}/mes={mes:02d}'
+
+
+def _estatisticas_grupo(grupo: pd.DataFrame) -> dict:
+    """
+    Calcula as estatísticas de mínimo e máximo de um conjunto de linhas de uma partição.
+    """
+    return {
+        'linhas': int(len(grupo)),
+        'data_min': grupo['data'].min().strftime('%Y-%m-%d'),
+        'data_max': grupo['data'].max().strftime('%Y-%m-%d'),
+        'vendas_min': int(grupo['vendas'].min()),
+        'vendas_max': int(grupo['vendas'].max()),
+        'valor_min': float(grupo['valor_do_veiculo'].min()),
+        'valor_max': float(grupo['valor_do_veiculo'].max()),
+    }
+
+
+def _combinar_estatisticas(atual: dict, novo: dict) -> dict:
+    """
+    Junta as estatísticas já gravadas de uma partição com as de linhas recém-anexadas.
+    """
+    if atual is None:
+        return novo
+    return {
+        'linhas': atual['linhas'] + novo['linhas'],
+        'data_min': min(atual['data_min'], novo['data_min']),
+        'data_max': max(atual['data_max'], novo['data_max']),
+        'vendas_min': min(atual['vendas_min'], novo['vendas_min']),
+        'vendas_max': max(atual['vendas_max'], novo['vendas_max']),
+        'valor_min': min(atual['valor_min'], novo['valor_min']),
+        'valor_max': max(atual['valor_max'], novo['valor_max']),
+    }
+
+
+def ler_estatisticas(diretorio: str) -> dict:
+    """
+    Lê as estatísticas por partição gravadas em `estatisticas.json`.
+
+    Args:
+        diretorio (str): Diretório raiz do conjunto particionado.
+
+    Returns:
+        dict: Mapeamento partição ('ano=AAAA/mes=MM') -> estatísticas. Vazio se não houver partições.
+    """
+    caminho = os.path.join(diretorio, ARQUIVO_ESTATISTICAS)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def _gravar_estatisticas(diretorio: str, estatisticas: dict) -> None:
+    caminho = os.path.join(diretorio, ARQUIVO_ESTATISTICAS)
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(dict(sorted(estatisticas.items())), arquivo, indent=2)
+    os.replace(temporario, caminho)
+
+
+def ler_assinatura_particoes(diretorio: str) -> dict:
+    """
+    Lê a assinatura_arquivo do arquivo de dados que as partições representam.
+
+    Args:
+        diretorio (str): Diretório raiz do conjunto particionado.
+
+    Returns:
+        dict | None: A assinatura, ou None se o diretório não tem partições ou assinatura.
+    """
+    caminho = os.path.join(diretorio, ARQUIVO_ASSINATURA)
+    if not os.path.exists(os.path.join(diretorio, ARQUIVO_ESTATISTICAS)) or not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def gravar_assinatura_particoes(diretorio: str, assinatura: dict) -> None:
+    """
+    Registra a assinatura_arquivo do arquivo de dados que as partições passam a representar.
+
+    Args:
+        diretorio (str): Diretório raiz do conjunto particionado.
+        assinatura (dict): Assinatura do arquivo de dados.
+    """
+    caminho = os.path.join(diretorio, ARQUIVO_ASSINATURA)
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as arquivo:
+        json.dump(assinatura, arquivo)
+    os.replace(caminho + '.tmp', caminho)
+
+
+def anexar_particoes(dados: pd.DataFrame, diretorio: str) -> list:
+    """
+    Anexa linhas validadas às partições de ano/mês correspondentes e atualiza as estatísticas.
+
+    Args:
+        dados (pd.DataFrame): Linhas já validadas (ver validacao.py).
+        diretorio (str): Diretório raiz do conjunto particionado.
+
+    Returns:
+        list: Partições que receberam linhas.
+    """
+    if dados.empty:
+        return []
+
+    estatisticas = ler_estatisticas(diretorio)
+    datas = pd.to_datetime(dados['data'])
+    dados = dados.assign(data=datas)
+    tocadas = []
+    for (ano, mes), grupo in dados.groupby([datas.dt.year, datas.dt.month]):
+        chave = _chave_particao(ano, mes)
+        pasta = os.path.join(diretorio, chave)
+        os.makedirs(pasta, exist_ok=True)
+        caminho = os.path.join(pasta, ARQUIVO_PARTICAO)
+        novo = not os.path.exists(caminho)
+        grupo[COLUNAS].to_csv(caminho, mode='a', header=novo, index=False, date_format='%Y-%m-%d')
+        estatisticas[chave] = _combinar_estatisticas(estatisticas.get(chave), _estatisticas_grupo(grupo))
+        tocadas.append(chave)
+
+    _gravar_estatisticas(diretorio, estatisticas)
+    return tocadas
+
+
+def particionar_arquivo(caminho_arquivo: str, diretorio: str, caminho_quarentena: str = None,
+                        tamanho_bloco: int = TAMANHO_BLOCO_PADRAO, resumo: dict = None) -> dict:
+    """
+    Reconstrói o conjunto particionado por ano/mês a partir do arquivo de dados.
+
+    A leitura, a validação e a gravação das partições acontecem no mesmo passe, bloco a bloco.
+    O conteúdo anterior de `diretorio` é descartado, e a assinatura_arquivo lida é gravada com
+    as partições.
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo de dados (ex.: Dataset/dados_cleaned.csv).
+        diretorio (str): Diretório raiz do conjunto particionado.
+        caminho_quarentena (str, optional): Caminho do CSV de quarentena das linhas inválidas.
+        tamanho_bloco (int): Número de linhas lidas por vez.
+        resumo (dict, optional): Preenchido com o número de linhas enviadas para a quarentena.
+
+    Returns:
+        dict: Estatísticas por partição.
+    """
+    if os.path.isdir(diretorio):
+        shutil.rmtree(diretorio)
+    os.makedirs(diretorio)
+
+    # Lida antes da leitura: se o arquivo mudar durante ela, a assinatura não vai conferir
+    assinatura = assinatura_arquivo(caminho_arquivo)
+    for bloco in iterar_blocos_validados(caminho_arquivo, caminho_quarentena, tamanho_bloco, resumo=resumo):
+        anexar_particoes(bloco, diretorio)
+    gravar_assinatura_particoes(diretorio, assinatura)
+    return ler_estatisticas(diretorio)
+
+
+def particionar_se_desatualizado(caminho_arquivo: str, diretorio: str,
+                                 tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> bool:
+    """
+    Reconstrói as partições se elas não existem ou não correspondem mais ao arquivo de dados.
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo de dados.
+        diretorio (str): Diretório raiz do conjunto particionado.
+        tamanho_bloco (int): Número de linhas lidas por vez.
+
+    Returns:
+        bool: True se as partições foram reconstruídas.
+    """
+    if ler_assinatura_particoes(diretorio) == assinatura_arquivo(caminho_arquivo):
+        return False
+    particionar_arquivo(caminho_arquivo, diretorio, tamanho_bloco=tamanho_bloco)
+    return True
+
+
+def selecionar_particoes(diretorio: str, inicio=None, fim=None) -> list:
+    """
+    Seleciona as partições cujo intervalo de datas [data_min, data_max] cruza o período pedido.
+
+    Args:
+        diretorio (str): Diretório raiz do conjunto particionado.
+        inicio (str | pd.Timestamp, optional): Data inicial (inclusiva). Sem limite se omitida.
+        fim (str | pd.Timestamp, optional): Data final (inclusiva). Sem limite se omitida.
+
+    Returns:
+        list: Partições selecionadas, em ordem cronológica.
+    """
+    inicio = pd.Timestamp(inicio) if inicio is not None else None
+    fim = pd.Timestamp(fim) if fim is not None else None
+    selecionadas = []
+    for chave, estatistica in sorted(ler_estatisticas(diretorio).items()):
+        if inicio is not None and pd.Timestamp(estatistica['data_max']) < inicio:
+            continue
+        if fim is not None and pd.Timestamp(estatistica['data_min']) > fim:
+            continue
+        selecionadas.append(chave)
+    return selecionadas
+
+
+def _ler_particoes(diretorio: str, particoes: list, inicio=None, fim=None) -> pd.DataFrame:
+    """
+    Lê as partições indicadas e mantém apenas as linhas dentro do período.
+    """
+    blocos = [pd.read_csv(os.path.join(diretorio, chave, ARQUIVO_PARTICAO), dtype=_TIPOS_PARTICAO,
+                          parse_dates=['data'])
+              for chave in particoes]
+    if not blocos:
+        dados = pd.DataFrame({coluna: pd.Series(dtype=_TIPOS_PARTICAO.get(coluna, 'datetime64[ns]'))
+                              for coluna in COLUNAS})
+    else:
+        dados = pd.concat(blocos, ignore_index=True)
+
+    filtro = pd.Series(True, index=dados.index)
+    if inicio is not None:
+        filtro &= dados['data'] >= pd.Timestamp(inicio)
+    if fim is not None:
+        filtro &= dados['data'] <= pd.Timestamp(fim)
+    dados = dados[filtro].reset_index(drop=True)
+    dados.attrs['particoes_lidas'] = list(particoes)
+    return dados
+
+
+def carregar_intervalo(diretorio: str, inicio=None, fim=None) -> pd.DataFrame:
+    """
+    Carrega apenas as partições que cruzam o período pedido.
+
+    Args:
+        diretorio (str): Diretório raiz do conjunto particionado.
+        inicio (str | pd.Timestamp, optional): Data inicial (inclusiva). Sem limite se omitida.
+        fim (str | pd.Timestamp, optional): Data final (inclusiva). Sem limite se omitida.
+
+    Returns:
+        pd.DataFrame: Linhas do período. As partições lidas ficam em `dados.attrs['particoes_lidas']`.
+    """
+    return _ler_particoes(diretorio, selecionar_particoes(diretorio, inicio, fim), inicio, fim)
+
+
+def _obter_relatorio(relatorio):
+    if callable(relatorio):
+        return relatorio
+    if relatorio not in RELATORIOS:
+        raise ValueError(f'Relatório {relatorio!r} desconhecido. Use um de: {", ".join(RELATORIOS)}.')
+    return RELATORIOS[relatorio]
+
+
+def relatorio_por_periodo(diretorio: str, relatorio, frequencia: str = 'ano', inicio=None, fim=None,
+                          **parametros) -> pd.DataFrame:
+    """
+    Calcula um relatório separadamente para cada ano ou mês do período pedido.
+
+    Cada período é calculado apenas com as suas partições, então a memória usada é a de um
+    período por vez.
+
+    Args:
+        diretorio (str): Diretório raiz do conjunto particionado.
+        relatorio (str | callable): Nome em agregacoes.RELATORIOS ou função que recebe o DataFrame.
+        frequencia (str): 'ano' ou 'mes'.
+        inicio (str | pd.Timestamp, optional): Data inicial (inclusiva).
+        fim (str | pd.Timestamp, optional): Data final (inclusiva).
+        **parametros: Argumentos extras repassados ao relatório (ex.: n=5 para top_veiculos).
+
+    Returns:
+        pd.DataFrame: As tabelas de cada período empilhadas, com a coluna 'periodo' na frente.
+    """
+    if frequencia not in ('ano', 'mes'):
+        raise ValueError("A frequência deve ser 'ano' ou 'mes'.")
+    funcao = _obter_relatorio(relatorio)
+
+    periodos = {}
+    for chave in selecionar_particoes(diretorio, inicio, fim):
+        ano, mes = (int(parte.split('=')[1]) for parte in chave.split('/'))
+        periodo = f'{ano:04d}' if frequencia == 'ano' else f'{ano:04d}-{mes:02d}'
+        periodos.setdefault(periodo, []).append(chave)
+
+    tabelas = []
+    for periodo, particoes in periodos.items():
+        tabela = funcao(_ler_particoes(diretorio, particoes, inicio, fim), **parametros)
+        tabela.insert(0, 'periodo', periodo)
+        tabelas.append(tabela)
+    if not tabelas:
+        return pd.DataFrame(columns=['periodo'])
+    return pd.concat(tabelas, ignore_index=True)
+
+
+def relatorio_por_ano(diretorio: str, relatorio, inicio=None, fim=None, **parametros) -> pd.DataFrame:
+    """
+    Versão anual de um relatório. Ver relatorio_por_periodo.
+    """
+    return relatorio_por_periodo(diretorio, relatorio, 'ano', inicio, fim, **parametros)
+
+
+def relatorio_por_mes(diretorio: str, relatorio, inicio=None, fim=None, **parametros) -> pd.DataFrame:
+    """
+    Versão mensal de um relatório. Ver relatorio_por_periodo.
+    """
+    return relatorio_por_periodo(diretorio, relatorio, 'mes', inicio, fim, **parametros)
+
+
+def relatorio_ultimos_dias(diretorio: str, relatorio, dias: int = 30, referencia=None, **parametros) -> pd.DataFrame:
+    """
+    Calcula um relatório sobre os últimos `dias` dias, lendo só as partições desse período.
+
+    Args:
+        diretorio (str): Diretório raiz do conjunto particionado.
+        relatorio (str | callable): Nome em agregacoes.RELATORIOS ou função que recebe o DataFrame.
+        dias (int): Tamanho da janela, em dias, terminando em `referencia`.
+        referencia (str | pd.Timestamp, optional): Último dia da janela. Usa a data mais recente
+            do conjunto se omitida.
+        **parametros: Argumentos extras repassados ao relatório.
+
+    Returns:
+        pd.DataFrame: Tabela do relatório. As partições lidas ficam em `tabela.attrs['particoes_lidas']`.
+    """
+    if referencia is None:
+        estatisticas = ler_estatisticas(diretorio)
+        if not estatisticas:
+            raise ValueError(f'Nenhuma partição encontrada em {diretorio}.')
+        referencia = max(estatistica['data_max'] for estatistica in estatisticas.values())
+    fim = pd.Timestamp(referencia)
+    inicio = fim - pd.Timedelta(days=dias - 1)
+
+    dados = carregar_intervalo(diretorio, inicio, fim)
+    tabela = _obter_relatorio(relatorio)(dados, **parametros)
+    tabela.attrs['particoes_lidas'] = dados.attrs['particoes_lidas']
+    return tabela
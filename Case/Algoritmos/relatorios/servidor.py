@@ -0,0 +1,353 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from relatorios.agregacoes import RELATORIOS, codificar
+from relatorios.validacao import avisar_quarentena, carregar_dados_validados
+
+CAPACIDADE_CACHE_PADRAO = 128
+INTERVALO_VERIFICACAO_PADRAO = 1.0
+TAMANHO_MAXIMO_CABECALHO = 64 * 1024
+
+
+def _converter_data(valor: str) -> pd.Timestamp:
+    """
+    Converte o parâmetro em data, recusando valores que o pandas aceita como ausentes (ex.: 'NaT').
+    """
+    data = pd.Timestamp(valor)
+    if pd.isna(data):
+        raise ValueError(f'Data ausente: {valor!r}.')
+    return data
+
+
+def _converter_inteiro_positivo(valor: str) -> int:
+    """
+    Converte o parâmetro em inteiro maior que zero.
+    """
+    numero = int(valor)
+    if numero <= 0:
+        raise ValueError(f'O valor deve ser maior que zero: {valor!r}.')
+    return numero
+
+
+# Parâmetros aceitos por relatório, além de 'inicio' e 'fim' (filtro por data), com a conversão de cada um
+PARAMETROS_RELATORIOS = {
+    'top_veiculos': {'n': _converter_inteiro_positivo},
+}
+
+_STATUS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+}
+
+
+class ErroRequisicao(Exception):
+    """
+    Erro causado por uma requisição inválida, devolvido ao cliente com o status indicado.
+    """
+
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+
+
+class CacheAgregados:
+    """
+    Cache LRU em memória das respostas já calculadas, limitado a `capacidade` entradas.
+
+    Attributes:
+        capacidade (int): Número máximo de respostas guardadas.
+    """
+
+    def __init__(self, capacidade: int = CAPACIDADE_CACHE_PADRAO):
+        self.capacidade = capacidade
+        self._entradas = OrderedDict()
+
+    def obter(self, chave):
+        """
+        Retorna a resposta guardada para a chave (ou None), marcando-a como usada agora.
+        """
+        if chave not in self._entradas:
+            return None
+        self._entradas.move_to_end(chave)
+        return self._entradas[chave]
+
+    def guardar(self, chave, valor) -> None:
+        """
+        Guarda uma resposta, descartando a usada há mais tempo se o limite for atingido.
+        """
+        self._entradas[chave] = valor
+        self._entradas.move_to_end(chave)
+        while len(self._entradas) > self.capacidade:
+            self._entradas.popitem(last=False)
+
+    def limpar(self) -> None:
+        self._entradas.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+class ServidorRelatorios:
+    """
+    Serviço HTTP local (asyncio, apenas biblioteca padrão) que expõe os relatórios como JSON.
+
+    O conjunto de dados é carregado uma vez; cada relatório é calculado na primeira requisição
+    com um dado conjunto de parâmetros e guardado em um CacheAgregados. Requisições simultâneas
+    para a mesma chave aguardam o mesmo cálculo. Se o arquivo de dados mudar (data de modificação
+    ou tamanho), ele é recarregado e o cache é esvaziado.
+
+    Endpoints:
+        GET /relatorios: Lista os relatórios disponíveis.
+        GET /relatorios/<nome>?inicio=AAAA-MM-DD&fim=AAAA-MM-DD: Tabela do relatório em JSON.
+            'top_veiculos' aceita também o parâmetro n.
+        GET /saude: Estado do serviço e do conjunto de dados carregado.
+
+    Attributes:
+        caminho_arquivo (str): Caminho do arquivo de dados.
+        cache (CacheAgregados): Respostas já calculadas.
+        intervalo_verificacao (float): Intervalo mínimo, em segundos, entre verificações do arquivo.
+    """
+
+    def __init__(self, caminho_arquivo: str, capacidade_cache: int = CAPACIDADE_CACHE_PADRAO,
+                 intervalo_verificacao: float = INTERVALO_VERIFICACAO_PADRAO):
+        """
+        Inicializa o serviço e carrega o conjunto de dados.
+
+        Args:
+            caminho_arquivo (str): Caminho do arquivo de dados.
+            capacidade_cache (int): Número máximo de respostas guardadas em memória.
+            intervalo_verificacao (float): Intervalo mínimo, em segundos, entre verificações do arquivo.
+        """
+        self.caminho_arquivo = caminho_arquivo
+        self.cache = CacheAgregados(capacidade_cache)
+        self.intervalo_verificacao = intervalo_verificacao
+        self._em_andamento = {}
+        self._trava_recarga = asyncio.Lock()
+        self._ultima_verificacao = 0.0
+        self._carregar()
+
+    def _assinatura_arquivo(self) -> tuple:
+        informacoes = os.stat(self.caminho_arquivo)
+        return informacoes.st_mtime_ns, informacoes.st_size
+
+    def _carregar(self) -> None:
+        """
+        Carrega o conjunto de dados e registra a assinatura do arquivo lido.
+        """
+        assinatura = self._assinatura_arquivo()
+        self.dados = carregar_dados_validados(self.caminho_arquivo)
+        avisar_quarentena(self.dados.attrs)
+        # As chaves de agrupamento são codificadas uma vez e reaproveitadas pelas consultas sem filtro
+        self.codificados = codificar(self.dados)
+        self.assinatura = assinatura
+        self.versao = f'{assinatura[0]}-{assinatura[1]}'
+
+    async def _verificar_alteracao(self) -> None:
+        """
+        Recarrega os dados e esvazia o cache se o arquivo mudou desde a última carga.
+        """
+        agora = time.monotonic()
+        if agora - self._ultima_verificacao < self.intervalo_verificacao:
+            return
+        self._ultima_verificacao = agora
+
+        if self._assinatura_arquivo() == self.assinatura:
+            return
+        async with self._trava_recarga:
+            if self._assinatura_arquivo() == self.assinatura:
+                return
+            await asyncio.get_running_loop().run_in_executor(None, self._carregar)
+            self.cache.limpar()
+
+    def _interpretar_parametros(self, nome: str, consulta: dict) -> tuple:
+        """
+        Valida e converte os parâmetros da consulta de um relatório.
+
+        Returns:
+            tuple: Pares (parâmetro, valor) ordenados, usados também como parte da chave do cache.
+        """
+        aceitos = {'inicio': _converter_data, 'fim': _converter_data, **PARAMETROS_RELATORIOS.get(nome, {})}
+        parametros = {}
+        for parametro, valores in consulta.items():
+            if parametro not in aceitos:
+                raise ErroRequisicao(400, f'Parâmetro {parametro!r} não aceito pelo relatório {nome!r}.')
+            try:
+                valor = aceitos[parametro](valores[-1])
+            except (ValueError, TypeError, OverflowError):
+                raise ErroRequisicao(400, f'Valor inválido para o parâmetro {parametro!r}: {valores[-1]!r}.')
+            parametros[parametro] = valor.strftime('%Y-%m-%d') if isinstance(valor, pd.Timestamp) else valor
+        return tuple(sorted(parametros.items()))
+
+    def _calcular(self, nome: str, parametros: tuple) -> bytes:
+        """
+        Calcula um relatório e o serializa em JSON.
+        """
+        argumentos = dict(parametros)
+        inicio = argumentos.pop('inicio', None)
+        fim = argumentos.pop('fim', None)
+
+        dados = self.codificados
+        if inicio is not None or fim is not None:
+            dados = self.dados
+            filtro = pd.Series(True, index=dados.index)
+            if inicio is not None:
+                filtro &= dados['data'] >= pd.Timestamp(inicio)
+            if fim is not None:
+                filtro &= dados['data'] <= pd.Timestamp(fim)
+            dados = dados[filtro]
+
+        tabela = RELATORIOS[nome](dados, **argumentos)
+        registros = json.loads(tabela.to_json(orient='records', force_ascii=False, date_format='iso'))
+        resposta = {'relatorio': nome, 'parametros': dict(parametros), 'versao_dados': self.versao, 'linhas': registros}
+        return json.dumps(resposta, ensure_ascii=False).encode('utf-8')
+
+    async def obter_relatorio(self, nome: str, parametros: tuple = ()) -> bytes:
+        """
+        Retorna o JSON de um relatório, calculando-o apenas se ainda não estiver no cache.
+
+        Args:
+            nome (str): Nome do relatório em agregacoes.RELATORIOS.
+            parametros (tuple): Pares (parâmetro, valor) já validados.
+
+        Returns:
+            bytes: Corpo JSON da resposta.
+        """
+        if nome not in RELATORIOS:
+            raise ErroRequisicao(404, f'Relatório {nome!r} não encontrado.')
+        await self._verificar_alteracao()
+
+        chave = (self.versao, nome, parametros)
+        resposta = self.cache.obter(chave)
+        if resposta is not None:
+            return resposta
+
+        # Requisições simultâneas para a mesma chave aguardam o mesmo cálculo
+        if chave in self._em_andamento:
+            return await asyncio.shield(self._em_andamento[chave])
+
+        tarefa = asyncio.get_running_loop().run_in_executor(None, self._calcular, nome, parametros)
+        self._em_andamento[chave] = tarefa
+        try:
+            resposta = await tarefa
+        finally:
+            del self._em_andamento[chave]
+        if chave[0] == self.versao:
+            self.cache.guardar(chave, resposta)
+        return resposta
+
+    async def _responder(self, caminho: str) -> bytes:
+        """
+        Encaminha uma requisição GET para o endpoint correspondente.
+        """
+        partes = urlsplit(caminho)
+        rota = partes.path.rstrip('/') or '/'
+
+        if rota == '/saude':
+            await self._verificar_alteracao()
+            return json.dumps({
+                'status': 'ok',
+                'arquivo': self.caminho_arquivo,
+                'versao_dados': self.versao,
+                'linhas': int(len(self.dados)),
+                'respostas_em_cache': len(self.cache),
+            }, ensure_ascii=False).encode('utf-8')
+
+        if rota == '/relatorios':
+            return json.dumps({'relatorios': sorted(RELATORIOS)}, ensure_ascii=False).encode('utf-8')
+
+        if rota.startswith('/relatorios/'):
+            nome = rota[len('/relatorios/'):]
+            if nome not in RELATORIOS:
+                raise ErroRequisicao(404, f'Relatório {nome!r} não encontrado.')
+            parametros = self._interpretar_parametros(nome, parse_qs(partes.query))
+            return await self.obter_relatorio(nome, parametros)
+
+        raise ErroRequisicao(404, f'Endpoint {rota!r} não encontrado.')
+
+    async def tratar_conexao(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        """
+        Atende as requisições HTTP/1.1 de uma conexão, mantendo-a aberta entre requisições
+        (keep-alive) enquanto o cliente pedir.
+        """
+        try:
+            while True:
+                try:
+                    cabecalho = await leitor.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                linhas = cabecalho.decode('latin-1').split('\r\n')
+                try:
+                    metodo, caminho, versao = linhas[0].split(' ', 2)
+                except ValueError:
+                    await self._enviar(escritor, 400, {'erro': 'Requisição malformada.'}, manter_conexao=False)
+                    break
+
+                campos = {}
+                for linha in linhas[1:]:
+                    if ':' in linha:
+                        campo, valor = linha.split(':', 1)
+                        campos[campo.strip().lower()] = valor.strip().lower()
+                conexao = campos.get('connection', '')
+                manter_conexao = conexao == 'keep-alive' if versao == 'HTTP/1.0' else conexao != 'close'
+
+                if metodo != 'GET':
+                    await self._enviar(escritor, 405, {'erro': 'Apenas GET é suportado.'}, manter_conexao)
+                else:
+                    try:
+                        corpo = await self._responder(caminho)
+                        await self._enviar(escritor, 200, corpo, manter_conexao)
+                    except ErroRequisicao as erro:
+                        await self._enviar(escritor, erro.status, {'erro': erro.mensagem}, manter_conexao)
+                    except Exception as erro:
+                        await self._enviar(escritor, 500, {'erro': str(erro)}, manter_conexao)
+
+                if not manter_conexao:
+                    break
+        finally:
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _enviar(self, escritor: asyncio.StreamWriter, status: int, corpo, manter_conexao: bool) -> None:
+        if not isinstance(corpo, bytes):
+            corpo = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        cabecalho = (
+            f'HTTP/1.1 {status} {_STATUS[status]}\r\n'
+            'Content-Type: application/json; charset=utf-8\r\n'
+            f'Content-Length: {len(corpo)}\r\n'
+            f'Connection: {"keep-alive" if manter_conexao else "close"}\r\n'
+            '\r\n'
+        )
+        escritor.write(cabecalho.encode('latin-1') + corpo)
+        await escritor.drain()
+
+
+async def executar_servidor(caminho_arquivo: str, host: str = '127.0.0.1', porta: int = 8000,
+                            capacidade_cache: int = CAPACIDADE_CACHE_PADRAO) -> None:
+    """
+    Inicia o serviço de relatórios e o mantém no ar até ser interrompido.
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo de dados.
+        host (str): Endereço de escuta.
+        porta (int): Porta de escuta.
+        capacidade_cache (int): Número máximo de respostas guardadas em memória.
+    """
+    servico = ServidorRelatorios(caminho_arquivo, capacidade_cache)
+    servidor = await asyncio.start_server(servico.tratar_conexao, host, porta, limit=TAMANHO_MAXIMO_CABECALHO)
+    print(f'Servindo relatórios de {caminho_arquivo} em http://{host}:{porta}/relatorios')
+    async with servidor:
+        await servidor.serve_forever()
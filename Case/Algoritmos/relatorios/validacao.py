@@ -0,0 +1,293 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from relatorios.exportacao import TAMANHO_BLOCO_PADRAO
+
+# Marcas de banco_corrigido_2.json, já sem os caracteres corrompidos e espaços extras
+MARCAS_CONHECIDAS = {
+    1: 'Fiat',
+    2: 'Volkswagen',
+    3: 'Kia',
+    4: 'Peugeot',
+    5: 'Toyota',
+    6: 'Nissan',
+    7: 'Mitsubishi',
+    8: 'Subaru',
+    9: 'Chevrolet',
+    10: 'JaC Motors',
+    11: 'Renault',
+}
+
+COLUNAS = ['data', 'id_marca_', 'vendas', 'valor_do_veiculo', 'nome', 'marca']
+
+# Esquema declarativo aplicado a cada bloco carregado. Cada coluna informa o tipo esperado,
+# se pode ficar vazia e os limites aceitos; as verificações são feitas de forma vetorizada
+# em validar_bloco e cada falha vira um motivo de quarentena com o nome indicado.
+ESQUEMA = {
+    'data': {'tipo': 'data', 'formato': '%Y-%m-%d'},
+    'id_marca_': {'tipo': 'inteiro', 'dominio': 'marcas'},
+    'vendas': {'tipo': 'inteiro', 'minimo': 0},
+    'valor_do_veiculo': {'tipo': 'decimal', 'minimo': 0, 'minimo_exclusivo': True},
+    'nome': {'tipo': 'texto'},
+    'marca': {'tipo': 'texto', 'opcional': True},
+}
+
+# Substituições feitas antes por recuperacaoDadosConcessionaria.js nos nomes corrompidos
+_SUBSTITUICOES_TEXTO = {'æ': 'a', 'ø': 'o'}
+
+
+def carregar_marcas(caminho_arquivo: str) -> dict:
+    """
+    Lê a tabela de marcas (formato de banco_corrigido_2.json) e normaliza os nomes.
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo JSON com os campos 'id_marca' e 'marca'.
+
+    Returns:
+        dict: Mapeamento id da marca -> nome da marca.
+    """
+    with open(caminho_arquivo, encoding='utf-8') as arquivo:
+        registros = json.load(arquivo)
+    marcas = pd.Series([r['marca'] for r in registros], index=[int(r['id_marca']) for r in registros])
+    return _normalizar_texto(marcas).to_dict()
+
+
+def _normalizar_texto(serie: pd.Series) -> pd.Series:
+    """
+    Remove espaços extras e corrige os caracteres corrompidos de uma coluna de texto.
+    """
+    texto = serie.astype('string').str.strip()
+    for antigo, novo in _SUBSTITUICOES_TEXTO.items():
+        texto = texto.str.replace(antigo, novo, regex=False)
+    return texto.mask(texto == '')
+
+
+def validar_bloco(bloco: pd.DataFrame, marcas: dict = None):
+    """
+    Aplica o ESQUEMA a um bloco de linhas ainda não tipadas.
+
+    Os valores são convertidos para os tipos finais (ex.: vendas "2" -> 2) e os nomes de
+    marca e veículo são normalizados. Linhas que falham em qualquer verificação são
+    separadas com a lista de motivos.
+
+    Args:
+        bloco (pd.DataFrame): Linhas lidas do arquivo de origem.
+        marcas (dict, optional): Mapeamento id da marca -> nome. Usa MARCAS_CONHECIDAS se omitido.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: As linhas válidas, já tipadas, e as linhas rejeitadas
+        com os valores originais e a coluna 'motivo'.
+    """
+    marcas = MARCAS_CONHECIDAS if marcas is None else marcas
+    original = bloco
+    convertido = pd.DataFrame(index=bloco.index)
+    motivos = pd.Series('', index=bloco.index, dtype=object)
+
+    def registrar(falhas, motivo):
+        nonlocal motivos
+        motivos = motivos + np.where(falhas, motivo + ';', '')
+
+    for coluna, regra in ESQUEMA.items():
+        if coluna not in bloco.columns:
+            if regra.get('opcional'):
+                convertido[coluna] = pd.Series(pd.NA, index=bloco.index, dtype='string')
+                continue
+            registrar(np.ones(len(bloco), dtype=bool), f'{coluna}_ausente')
+            convertido[coluna] = pd.NA
+            continue
+
+        bruto = bloco[coluna]
+        nulos = bruto.isna() | (bruto.astype('string').str.strip() == '')
+        nulos = nulos.fillna(True).to_numpy(dtype=bool)
+        if not regra.get('opcional'):
+            registrar(nulos, f'{coluna}_nulo')
+
+        tipo = regra['tipo']
+        if tipo == 'texto':
+            convertido[coluna] = _normalizar_texto(bruto)
+            continue
+
+        if tipo == 'data':
+            valores = pd.to_datetime(bruto.astype('string').str.strip(), format=regra['formato'], errors='coerce')
+        else:
+            valores = pd.to_numeric(bruto.astype('string').str.strip(), errors='coerce').astype('float64')
+        invalidos = valores.isna().to_numpy() & ~nulos
+        registrar(invalidos, f'{coluna}_tipo_invalido')
+
+        if tipo == 'inteiro':
+            registrar((valores % 1 != 0).to_numpy() & valores.notna().to_numpy(), f'{coluna}_nao_inteiro')
+        if 'minimo' in regra:
+            abaixo = valores <= regra['minimo'] if regra.get('minimo_exclusivo') else valores < regra['minimo']
+            registrar(abaixo.to_numpy(), f'{coluna}_fora_do_intervalo')
+        if 'maximo' in regra:
+            registrar((valores > regra['maximo']).to_numpy(), f'{coluna}_fora_do_intervalo')
+        if regra.get('dominio') == 'marcas':
+            desconhecidos = ~valores.isin(list(marcas)) & valores.notna()
+            registrar(desconhecidos.to_numpy(), f'{coluna}_desconhecido')
+        convertido[coluna] = valores
+
+    # A marca é derivada do id quando não vem no arquivo (broken_database_1.json) e
+    # conferida contra o id quando vem (dados_cleaned.csv)
+    marca_do_id = convertido['id_marca_'].map(marcas).astype('string')
+    informada = convertido['marca'].notna()
+    divergentes = (informada & marca_do_id.notna() & (convertido['marca'] != marca_do_id)).fillna(False)
+    registrar(divergentes.to_numpy(dtype=bool), 'marca_inconsistente')
+    convertido['marca'] = convertido['marca'].fillna(marca_do_id)
+
+    rejeitadas = motivos != ''
+    validas = convertido.loc[~rejeitadas, COLUNAS].astype({
+        'id_marca_': 'int64',
+        'vendas': 'int64',
+        'valor_do_veiculo': 'float64',
+        'nome': object,
+        'marca': object,
+    })
+
+    quarentena = original.loc[rejeitadas].copy()
+    quarentena['motivo'] = motivos[rejeitadas].str.rstrip(';')
+    return validas, quarentena
+
+
+def _ler_blocos(caminho_arquivo: str, tamanho_bloco: int):
+    """
+    Lê o arquivo de origem em blocos, sem conversão de tipos.
+
+    Arquivos CSV são lidos em fatias pelo próprio pandas; arquivos JSON (lista de registros,
+    como broken_database_1.json) são lidos de uma vez e fatiados.
+    """
+    extensao = os.path.splitext(caminho_arquivo)[1].lower()
+    if extensao == '.json':
+        with open(caminho_arquivo, encoding='utf-8') as arquivo:
+            registros = pd.DataFrame(json.load(arquivo), dtype=object)
+        for inicio in range(0, max(len(registros), 1), tamanho_bloco):
+            yield registros.iloc[inicio:inicio + tamanho_bloco]
+    elif extensao == '.jsonl':
+        yield from pd.read_json(caminho_arquivo, lines=True, dtype=False, chunksize=tamanho_bloco)
+    else:
+        yield from pd.read_csv(caminho_arquivo, dtype=str, keep_default_na=False, na_values=[''],
+                               chunksize=tamanho_bloco)
+
+
+def caminho_quarentena_padrao(caminho_arquivo: str) -> str:
+    """
+    Retorna o caminho usado para a quarentena quando nenhum é informado:
+    `<arquivo>_quarentena.csv`, ao lado do arquivo de origem.
+    """
+    return os.path.splitext(caminho_arquivo)[0] + '_quarentena.csv'
+
+
+def assinatura_arquivo(caminho_arquivo: str) -> dict:
+    """
+    Tamanho e data de modificação do arquivo de dados, usados para saber se estados derivados
+    dele (agregados, partições, amostra) ainda correspondem a ele.
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo de dados.
+
+    Returns:
+        dict | None: {'tamanho': bytes, 'modificacao_ns': data de modificação em nanossegundos},
+        ou None se o arquivo não existe.
+    """
+    if not os.path.exists(caminho_arquivo):
+        return None
+    informacoes = os.stat(caminho_arquivo)
+    return {'tamanho': informacoes.st_size, 'modificacao_ns': informacoes.st_mtime_ns}
+
+
+def caminho_quarentena_anexos(caminho_arquivo: str) -> str:
+    """
+    Retorna o caminho da quarentena das linhas rejeitadas ao anexar vendas novas:
+    `<arquivo>_quarentena_anexos.csv`. Fica separada da quarentena da carga, que é recriada a
+    cada leitura completa do arquivo, para que essas rejeições não se percam.
+    """
+    return os.path.splitext(caminho_arquivo)[0] + '_quarentena_anexos.csv'
+
+
+def iterar_blocos_validados(caminho_arquivo: str, caminho_quarentena: str = None,
+                            tamanho_bloco: int = TAMANHO_BLOCO_PADRAO, marcas: dict = None,
+                            resumo: dict = None):
+    """
+    Lê o arquivo em blocos e devolve cada bloco já validado, gravando as rejeições na quarentena.
+
+    É a base de carregar_dados_validados e permite que outras etapas (ex.: o particionamento)
+    consumam as linhas válidas no mesmo passe da leitura, sem montar o conjunto inteiro em memória.
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo de dados (CSV, JSON ou JSON Lines).
+        caminho_quarentena (str, optional): Caminho do CSV de quarentena. Usa caminho_quarentena_padrao se omitido.
+        tamanho_bloco (int): Número de linhas lidas e validadas por vez.
+        marcas (dict, optional): Mapeamento id da marca -> nome. Usa MARCAS_CONHECIDAS se omitido.
+        resumo (dict, optional): Preenchido ao final com 'linhas_em_quarentena' e 'caminho_quarentena'.
+
+    Yields:
+        pd.DataFrame: Linhas válidas de cada bloco, com tipos convertidos e nomes normalizados.
+    """
+    caminho_quarentena = caminho_quarentena or caminho_quarentena_padrao(caminho_arquivo)
+    if os.path.exists(caminho_quarentena):
+        os.remove(caminho_quarentena)
+
+    total_rejeitadas = 0
+    arquivo_quarentena = None
+    try:
+        for bloco in _ler_blocos(caminho_arquivo, tamanho_bloco):
+            limpas, rejeitadas = validar_bloco(bloco, marcas)
+            if not rejeitadas.empty:
+                if arquivo_quarentena is None:
+                    arquivo_quarentena = open(caminho_quarentena, 'w', newline='', encoding='utf-8')
+                    rejeitadas.to_csv(arquivo_quarentena, index_label='linha')
+                else:
+                    rejeitadas.to_csv(arquivo_quarentena, index_label='linha', header=False)
+                total_rejeitadas += len(rejeitadas)
+            yield limpas
+    finally:
+        if arquivo_quarentena is not None:
+            arquivo_quarentena.close()
+
+    if resumo is not None:
+        resumo['linhas_em_quarentena'] = total_rejeitadas
+        resumo['caminho_quarentena'] = caminho_quarentena if total_rejeitadas else None
+
+
+def avisar_quarentena(resumo: dict) -> None:
+    """
+    Informa quantas linhas foram para a quarentena e onde, se alguma foi.
+
+    A leitura validada não imprime nada; os scripts chamam esta função com o `resumo` (ou com
+    `dados.attrs`) depois da carga.
+
+    Args:
+        resumo (dict): Resumo preenchido por iterar_blocos_validados.
+    """
+    if resumo.get('linhas_em_quarentena'):
+        print(f"{resumo['linhas_em_quarentena']} linha(s) enviadas para a quarentena "
+              f"em {resumo['caminho_quarentena']}.")
+
+
+def carregar_dados_validados(caminho_arquivo: str, caminho_quarentena: str = None,
+                             tamanho_bloco: int = TAMANHO_BLOCO_PADRAO, marcas: dict = None) -> pd.DataFrame:
+    """
+    Carrega o conjunto de dados aplicando a validação no mesmo passe da leitura.
+
+    Cada bloco lido é validado e convertido antes do próximo; as linhas rejeitadas são
+    gravadas na quarentena com os motivos, e apenas as linhas válidas são devolvidas.
+    O arquivo de quarentena só é criado se houver rejeições.
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo de dados (CSV, JSON ou JSON Lines).
+        caminho_quarentena (str, optional): Caminho do CSV de quarentena. Usa caminho_quarentena_padrao se omitido.
+        tamanho_bloco (int): Número de linhas lidas e validadas por vez.
+        marcas (dict, optional): Mapeamento id da marca -> nome. Usa MARCAS_CONHECIDAS se omitido.
+
+    Returns:
+        pd.DataFrame: Linhas válidas, com tipos convertidos e nomes normalizados. O número de
+        linhas rejeitadas fica em `dados.attrs['linhas_em_quarentena']`.
+    """
+    resumo = {}
+    validas = list(iterar_blocos_validados(caminho_arquivo, caminho_quarentena, tamanho_bloco, marcas, resumo))
+
+    dados = pd.concat(validas, ignore_index=True) if validas else pd.DataFrame(columns=COLUNAS)
+    dados.attrs.update(resumo)
+    return dados
@@ -0,0 +1,25 @@
+import argparse
+import asyncio
+
+from relatorios.servidor import CAPACIDADE_CACHE_PADRAO, executar_servidor
+
+def main():
+    """
+    Função principal para iniciar o serviço local de relatórios em JSON.
+    """
+    parser = argparse.ArgumentParser(description='Serviço local que expõe os relatórios de vendas como JSON.')
+    parser.add_argument('--arquivo', default='Dataset/dados_cleaned.csv', help='Arquivo de dados a ser servido.')
+    parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta.')
+    parser.add_argument('--porta', type=int, default=8000, help='Porta de escuta.')
+    parser.add_argument('--capacidade-cache', type=int, default=CAPACIDADE_CACHE_PADRAO,
+                        help='Número máximo de respostas guardadas em memória.')
+    argumentos = parser.parse_args()
+
+    try:
+        asyncio.run(executar_servidor(argumentos.arquivo, argumentos.host, argumentos.porta,
+                                      argumentos.capacidade_cache))
+    except KeyboardInterrupt:
+        print('Serviço encerrado.')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from relatorios.amostragem import AmostraEstratificada
+from relatorios.desempenho import gerar_dados
+from relatorios.validacao import carregar_dados_validados, validar_bloco
+
+
+def _estrato_unico(linhas: int) -> pd.DataFrame:
+    """
+    Linhas validadas de um único estrato (mesma marca e mês), identificadas pela coluna 'vendas'.
+    """
+    bloco = pd.DataFrame({
+        'data': '2022-01-10',
+        'id_marca_': '1',
+        'vendas': [str(i) for i in range(1, linhas + 1)],
+        'valor_do_veiculo': '29000',
+        'nome': 'Mobi',
+        'marca': 'Fiat',
+    }, dtype=object)
+    validas, _ = validar_bloco(bloco)
+    return validas
+
+
+def _ordenar(amostra: pd.DataFrame) -> pd.DataFrame:
+    return amostra.sort_values(['id_marca_', 'periodo'], kind='stable').reset_index(drop=True)
+
+
+def test_inclusao_uniforme_com_dados_em_varios_blocos():
+    linhas, capacidade, execucoes = 60, 12, 400
+    dados = _estrato_unico(linhas)
+    # Blocos de tamanhos diferentes, o primeiro menor que a capacidade
+    cortes = [0, 5, 17, 18, 31, 45, linhas]
+
+    inclusoes = np.zeros(linhas + 1, dtype=int)
+    for semente in range(execucoes):
+        amostra = AmostraEstratificada(capacidade_por_estrato=capacidade, semente=semente)
+        for inicio, fim in zip(cortes, cortes[1:]):
+            amostra.atualizar(dados.iloc[inicio:fim])
+        escolhidas = amostra.amostra['vendas'].to_numpy()
+        assert len(escolhidas) == capacidade and len(set(escolhidas)) == capacidade
+        inclusoes[escolhidas] += 1
+
+    # Cada linha entra com probabilidade capacidade / linhas; aceita 5 desvios padrão
+    esperado = execucoes * capacidade / linhas
+    desvio = np.sqrt(execucoes * capacidade / linhas * (1 - capacidade / linhas))
+    assert np.all(np.abs(inclusoes[1:] - esperado) < 5 * desvio), inclusoes[1:]
+    # As linhas de cada bloco não podem ser favorecidas em conjunto
+    for inicio, fim in zip(cortes, cortes[1:]):
+        media_bloco = inclusoes[1:][inicio:fim].mean()
+        assert abs(media_bloco - esperado) < 5 * desvio / np.sqrt(fim - inicio)
+
+
+@pytest.fixture
+def caminho_dados(tmp_path):
+    caminho = str(tmp_path / 'dados.csv')
+    gerar_dados(3_000).to_csv(caminho, index=False)
+    return caminho
+
+
+def test_resultados_exatos_quando_todos_os_estratos_cabem(caminho_dados):
+    dados = carregar_dados_validados(caminho_dados)
+    amostra = AmostraEstratificada.construir(caminho_dados, capacidade_por_estrato=1_000, tamanho_bloco=700)
+
+    assert amostra.total_linhas == len(dados) == len(amostra.amostra)
+
+    media = amostra.calcular_media_vendas().iloc[0]
+    assert media['media_de_vendas'] == pytest.approx(dados['vendas'].mean())
+    assert media['erro_padrao'] == 0
+    assert media['ic_inferior'] == media['ic_superior'] == pytest.approx(dados['vendas'].mean())
+
+    por_marca = amostra.calcular_vendas_por_marca().set_index('marca')
+    esperado = dados.groupby('marca')['vendas'].sum()
+    np.testing.assert_allclose(por_marca.loc[esperado.index, 'vendas'], esperado)
+    np.testing.assert_allclose(por_marca['vendas_ic_inferior'], por_marca['vendas_ic_superior'])
+    np.testing.assert_allclose(por_marca.loc[esperado.index, 'participacao'], esperado / esperado.sum())
+
+    correlacao = amostra.calcular_matriz_correlacao().iloc[0]
+    assert correlacao['correlacao'] == pytest.approx(dados['vendas'].corr(dados['valor_do_veiculo']))
+    assert correlacao['ic_inferior'] == correlacao['ic_superior'] == correlacao['correlacao']
+
+
+def test_salvar_e_carregar_preservam_o_estado_do_gerador(caminho_dados, tmp_path):
+    dados = carregar_dados_validados(caminho_dados)
+    inicio, novas = dados.iloc[:2_000], dados.iloc[2_000:]
+
+    original = AmostraEstratificada(capacidade_por_estrato=3, semente=7)
+    original.atualizar(inicio)
+    original.salvar(str(tmp_path / 'amostra'))
+    recarregada = AmostraEstratificada.carregar(str(tmp_path / 'amostra'))
+
+    assert recarregada.total_linhas == original.total_linhas
+    pd.testing.assert_frame_equal(_ordenar(recarregada.amostra), _ordenar(original.amostra))
+
+    # Com o mesmo estado do gerador, as mesmas linhas novas produzem a mesma amostra
+    original.atualizar(novas)
+    recarregada.atualizar(novas)
+    pd.testing.assert_frame_equal(_ordenar(recarregada.amostra), _ordenar(original.amostra))
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import matplotlib
+import pandas as pd
+
+matplotlib.use('Agg')
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from relatorios.exportacao import exportar_tabela
+
+
+def test_rodape_fica_fora_dos_formatos_tabulares(tmp_path):
+    tabela = pd.DataFrame({'Marca': ['Fiat', 'Kia'], 'Vendas': [3, 4]})
+    rodape = {'Marca': 'Total', 'Vendas': 7}
+
+    exportar_tabela(tabela, str(tmp_path / 'tabela.csv'), rodape=rodape)
+    exportar_tabela(tabela, str(tmp_path / 'tabela.html'), rodape=rodape)
+
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'tabela.csv'), tabela)
+    html = (tmp_path / 'tabela.html').read_text(encoding='utf-8')
+    assert '<tfoot><tr><td>Total</td><td class="num">7</td></tr></tfoot>' in html
+
+
+def test_png_de_tabela_vazia_desenha_apenas_o_cabecalho(tmp_path):
+    tabela = pd.DataFrame({'Marca': pd.Series(dtype=object), 'Vendas': pd.Series(dtype='int64')})
+    caminho = str(tmp_path / 'vazia.png')
+
+    exportar_tabela(tabela, caminho)
+
+    assert os.path.getsize(caminho) > 0
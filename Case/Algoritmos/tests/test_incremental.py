@@ -0,0 +1,146 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from relatorios import agregacoes
+from relatorios.desempenho import gerar_dados
+from relatorios.amostragem import carregar_ou_construir_amostra
+from relatorios.incremental import COLUNAS_CORRELACAO, AgregadosIncrementais
+from relatorios.particionamento import carregar_intervalo, particionar_se_desatualizado
+from relatorios.validacao import caminho_quarentena_anexos, carregar_dados_validados
+
+LINHAS_INICIAIS = 5_000
+LINHAS_POR_BLOCO = 500
+BLOCOS = 3
+
+
+def _comparar(obtida: pd.DataFrame, esperada: pd.DataFrame) -> None:
+    # As somas de ponto flutuante dependem da ordem em que os blocos foram agregados
+    pd.testing.assert_frame_equal(obtida, esperada, check_exact=False, rtol=1e-9)
+
+
+@pytest.fixture
+def agregados_anexados(tmp_path):
+    """
+    Constrói os agregados de um arquivo inicial, anexa blocos novos (com linhas inválidas)
+    e grava/recarrega o estado entre os blocos, como anexar_vendas.py faz a cada execução.
+    """
+    linhas = gerar_dados(LINHAS_INICIAIS + BLOCOS * LINHAS_POR_BLOCO)
+    caminho_arquivo = str(tmp_path / 'dados.csv')
+    caminho_estado = str(tmp_path / 'agregados.json')
+    linhas.iloc[:LINHAS_INICIAIS].to_csv(caminho_arquivo, index=False)
+
+    agregados = AgregadosIncrementais.construir(caminho_arquivo)
+    for bloco in range(BLOCOS):
+        inicio = LINHAS_INICIAIS + bloco * LINHAS_POR_BLOCO
+        agregados.anexar(linhas.iloc[inicio:inicio + LINHAS_POR_BLOCO], caminho_arquivo)
+        agregados.salvar(caminho_estado)
+        agregados = AgregadosIncrementais.carregar(caminho_estado)
+    return agregados, caminho_arquivo
+
+
+@pytest.mark.parametrize('nome', sorted(agregacoes.RELATORIOS))
+def test_tabelas_coincidem_com_o_calculo_completo(agregados_anexados, nome):
+    agregados, caminho_arquivo = agregados_anexados
+    dados = carregar_dados_validados(caminho_arquivo)
+
+    _comparar(agregados.tabela(nome), agregacoes.RELATORIOS[nome](dados))
+    _comparar(agregados.tabela(nome), AgregadosIncrementais.construir(caminho_arquivo).tabela(nome))
+
+
+def test_matriz_correlacao_coincide_com_o_calculo_completo(agregados_anexados):
+    agregados, caminho_arquivo = agregados_anexados
+    dados = carregar_dados_validados(caminho_arquivo)
+
+    _comparar(agregados.tabela('matriz_correlacao'), dados[COLUNAS_CORRELACAO].corr())
+    _comparar(agregados.tabela('matriz_correlacao'),
+              AgregadosIncrementais.construir(caminho_arquivo).tabela('matriz_correlacao'))
+
+
+def test_salvar_e_carregar_preservam_os_agregados(agregados_anexados, tmp_path):
+    agregados, caminho_arquivo = agregados_anexados
+    caminho_estado = str(tmp_path / 'copia.json')
+    agregados.salvar(caminho_estado)
+    recarregados = AgregadosIncrementais.carregar(caminho_estado)
+
+    assert recarregados.total_linhas == agregados.total_linhas
+    assert recarregados.assinatura == agregados.assinatura
+    for nome in sorted(agregacoes.RELATORIOS) + ['matriz_correlacao']:
+        pd.testing.assert_frame_equal(recarregados.tabela(nome), agregados.tabela(nome))
+
+
+def test_quarentena_dos_anexos_sobrevive_a_carga_completa(agregados_anexados):
+    _, caminho_arquivo = agregados_anexados
+    rejeitadas = len(pd.read_csv(caminho_quarentena_anexos(caminho_arquivo)))
+    assert rejeitadas > 0
+
+    carregar_dados_validados(caminho_arquivo)
+    assert len(pd.read_csv(caminho_quarentena_anexos(caminho_arquivo))) == rejeitadas
+
+
+def test_linhas_sem_data_vao_para_a_quarentena(tmp_path):
+    caminho_arquivo = str(tmp_path / 'dados.csv')
+    novas = pd.DataFrame({'id_marca_': ['1'], 'vendas': ['2'], 'valor_do_veiculo': ['29000'], 'nome': ['Mobi']})
+
+    validas = AgregadosIncrementais().anexar(novas, caminho_arquivo)
+
+    assert validas.empty
+    assert not os.path.exists(caminho_arquivo)
+    assert pd.read_csv(validas.attrs['caminho_quarentena'])['motivo'].tolist() == ['data_ausente']
+
+
+@pytest.fixture
+def arquivo_inicial(tmp_path):
+    linhas = gerar_dados(LINHAS_INICIAIS + LINHAS_POR_BLOCO)
+    caminho_arquivo = str(tmp_path / 'dados.csv')
+    linhas.iloc[:LINHAS_INICIAIS].to_csv(caminho_arquivo, index=False)
+    return caminho_arquivo, linhas.iloc[LINHAS_INICIAIS:]
+
+
+def test_anexar_recusa_particoes_inexistentes(arquivo_inicial, tmp_path):
+    caminho_arquivo, novas = arquivo_inicial
+    diretorio = str(tmp_path / 'particoes')
+    agregados = AgregadosIncrementais.construir(caminho_arquivo)
+
+    with pytest.raises(ValueError):
+        agregados.anexar(novas, caminho_arquivo, diretorio_particoes=diretorio)
+    assert not os.path.exists(diretorio)
+    assert len(pd.read_csv(caminho_arquivo)) == LINHAS_INICIAIS
+
+    assert particionar_se_desatualizado(caminho_arquivo, diretorio)
+    agregados.anexar(novas, caminho_arquivo, diretorio_particoes=diretorio)
+    assert not particionar_se_desatualizado(caminho_arquivo, diretorio)
+
+    dados = carregar_dados_validados(caminho_arquivo)
+    particionados = carregar_intervalo(diretorio)
+    assert len(particionados) == len(dados)
+    assert particionados['vendas'].sum() == dados['vendas'].sum()
+
+
+def test_anexar_recusa_amostra_desatualizada(arquivo_inicial, tmp_path):
+    caminho_arquivo, novas = arquivo_inicial
+    diretorio = str(tmp_path / 'amostra')
+    amostra = carregar_ou_construir_amostra(caminho_arquivo, diretorio)
+    agregados = AgregadosIncrementais.construir(caminho_arquivo)
+
+    # O arquivo cresce sem passar pela amostra
+    agregados.anexar(novas.iloc[:10], caminho_arquivo)
+    with pytest.raises(ValueError):
+        agregados.anexar(novas.iloc[10:], caminho_arquivo, amostra=amostra)
+
+    amostra = carregar_ou_construir_amostra(caminho_arquivo, diretorio)
+    agregados.anexar(novas.iloc[10:], caminho_arquivo, amostra=amostra)
+    amostra.salvar(diretorio)
+    assert carregar_ou_construir_amostra(caminho_arquivo, diretorio).total_linhas == amostra.total_linhas
+
+
+def test_anexar_recusa_agregados_desatualizados(arquivo_inicial):
+    caminho_arquivo, novas = arquivo_inicial
+    agregados = AgregadosIncrementais.construir(caminho_arquivo)
+    AgregadosIncrementais.construir(caminho_arquivo).anexar(novas.iloc[:10], caminho_arquivo)
+
+    with pytest.raises(ValueError):
+        agregados.anexar(novas.iloc[10:], caminho_arquivo)
@@ -0,0 +1,110 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from relatorios.agregacoes import RELATORIOS
+from relatorios.desempenho import gerar_dados
+from relatorios.particionamento import (
+    carregar_intervalo,
+    particionar_arquivo,
+    relatorio_por_ano,
+    relatorio_por_mes,
+    relatorio_ultimos_dias,
+    selecionar_particoes,
+)
+from relatorios.validacao import carregar_dados_validados
+
+LINHAS = 3_000
+
+
+@pytest.fixture(scope='module')
+def conjunto(tmp_path_factory):
+    """
+    Arquivo gerado (datas de 2022-01-01 a 2023-12-31) particionado por ano/mês, junto com
+    todas as linhas válidas carregadas diretamente do arquivo.
+    """
+    pasta = tmp_path_factory.mktemp('particionamento')
+    caminho_arquivo = str(pasta / 'dados.csv')
+    gerar_dados(LINHAS).to_csv(caminho_arquivo, index=False)
+    diretorio = str(pasta / 'particoes')
+    particionar_arquivo(caminho_arquivo, diretorio)
+    return diretorio, carregar_dados_validados(caminho_arquivo)
+
+
+def _filtrar(dados, inicio, fim):
+    return dados[(dados['data'] >= pd.Timestamp(inicio)) & (dados['data'] <= pd.Timestamp(fim))]
+
+
+def _comparar(obtida, esperada):
+    pd.testing.assert_frame_equal(obtida.reset_index(drop=True), esperada.reset_index(drop=True),
+                                  check_exact=False, rtol=1e-9)
+
+
+def test_particionar_cria_uma_particao_por_mes(conjunto):
+    diretorio, dados = conjunto
+
+    particoes = selecionar_particoes(diretorio)
+
+    assert len(particoes) == 24
+    assert particoes[0] == 'ano=2022/mes=01' and particoes[-1] == 'ano=2023/mes=12'
+    assert len(carregar_intervalo(diretorio)) == len(dados)
+
+
+def test_intervalo_le_apenas_as_particoes_sobrepostas(conjunto):
+    diretorio, dados = conjunto
+
+    periodo = carregar_intervalo(diretorio, '2022-03-15', '2022-05-02')
+
+    assert selecionar_particoes(diretorio, '2022-03-15', '2022-05-02') == \
+        ['ano=2022/mes=03', 'ano=2022/mes=04', 'ano=2022/mes=05']
+    assert periodo.attrs['particoes_lidas'] == ['ano=2022/mes=03', 'ano=2022/mes=04', 'ano=2022/mes=05']
+    # As partições são lidas mês a mês, então a ordem das linhas muda em relação ao arquivo
+    colunas = list(periodo.columns)
+    _comparar(periodo.sort_values(colunas), _filtrar(dados, '2022-03-15', '2022-05-02').sort_values(colunas))
+
+
+def test_ultimos_dias_le_apenas_as_particoes_da_janela(conjunto):
+    diretorio, dados = conjunto
+
+    tabela = relatorio_ultimos_dias(diretorio, 'vendas_por_marca', dias=10, referencia='2023-06-05')
+
+    assert tabela.attrs['particoes_lidas'] == ['ano=2023/mes=05', 'ano=2023/mes=06']
+    _comparar(tabela, RELATORIOS['vendas_por_marca'](_filtrar(dados, '2023-05-27', '2023-06-05')))
+
+
+def test_ultimos_dias_usa_a_data_mais_recente_por_padrao(conjunto):
+    diretorio, dados = conjunto
+
+    tabela = relatorio_ultimos_dias(diretorio, 'vendas_por_marca', dias=7)
+
+    fim = dados['data'].max()
+    assert tabela.attrs['particoes_lidas'] == ['ano=2023/mes=12']
+    _comparar(tabela, RELATORIOS['vendas_por_marca'](_filtrar(dados, fim - pd.Timedelta(days=6), fim)))
+
+
+@pytest.mark.parametrize('nome', sorted(RELATORIOS))
+def test_relatorio_por_mes_coincide_com_o_filtro_do_conjunto(conjunto, nome):
+    diretorio, dados = conjunto
+
+    tabela = relatorio_por_mes(diretorio, nome, inicio='2023-01-01', fim='2023-03-31')
+
+    assert list(tabela['periodo'].unique()) == ['2023-01', '2023-02', '2023-03']
+    for periodo, linhas in tabela.groupby('periodo'):
+        inicio = pd.Timestamp(periodo + '-01')
+        fim = inicio + pd.offsets.MonthEnd(0)
+        _comparar(linhas.drop(columns='periodo'), RELATORIOS[nome](_filtrar(dados, inicio, fim)))
+
+
+@pytest.mark.parametrize('nome', sorted(RELATORIOS))
+def test_relatorio_por_ano_coincide_com_o_filtro_do_conjunto(conjunto, nome):
+    diretorio, dados = conjunto
+
+    tabela = relatorio_por_ano(diretorio, nome)
+
+    assert list(tabela['periodo'].unique()) == ['2022', '2023']
+    for periodo, linhas in tabela.groupby('periodo'):
+        _comparar(linhas.drop(columns='periodo'),
+                  RELATORIOS[nome](_filtrar(dados, f'{periodo}-01-01', f'{periodo}-12-31')))
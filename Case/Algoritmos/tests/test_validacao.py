@@ -0,0 +1,105 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from relatorios.validacao import caminho_quarentena_padrao, carregar_dados_validados, validar_bloco
+
+
+def _bloco(*linhas):
+    """
+    Monta um bloco como o lido do CSV: todas as colunas como texto.
+    """
+    colunas = ['data', 'id_marca_', 'vendas', 'valor_do_veiculo', 'nome', 'marca']
+    return pd.DataFrame([dict(zip(colunas, linha)) for linha in linhas], dtype=object)
+
+
+def _motivos(bloco):
+    _, rejeitadas = validar_bloco(bloco)
+    return rejeitadas['motivo'].tolist()
+
+
+def test_converte_os_tipos_das_linhas_validas():
+    validas, rejeitadas = validar_bloco(_bloco(('2022-01-01', '1', '2', '29000', 'Mobi', 'Fiat')))
+
+    assert rejeitadas.empty
+    assert validas['vendas'].tolist() == [2]
+    assert validas['vendas'].dtype == 'int64'
+    assert validas['id_marca_'].dtype == 'int64'
+    assert validas['valor_do_veiculo'].tolist() == [29000.0]
+    assert validas['data'].tolist() == [pd.Timestamp('2022-01-01')]
+
+
+def test_normaliza_espacos_e_caracteres_corrompidos():
+    validas, rejeitadas = validar_bloco(_bloco(
+        ('2022-01-01', '1', '2', '29000', ' Mobi ', 'Fiat  '),
+        ('2022-01-01', '2', '3', '45000', 'Pølo', 'Volkswægen'),
+    ))
+
+    assert rejeitadas.empty
+    assert validas['nome'].tolist() == ['Mobi', 'Polo']
+    assert validas['marca'].tolist() == ['Fiat', 'Volkswagen']
+
+
+def test_marca_ausente_e_derivada_do_id():
+    bloco = _bloco(('2022-01-01', '3', '1', '80000', 'Cerato', None))
+
+    validas, _ = validar_bloco(bloco)
+
+    assert validas['marca'].tolist() == ['Kia']
+
+
+def test_id_de_marca_desconhecido_vai_para_a_quarentena():
+    assert _motivos(_bloco(('2022-01-01', '99', '1', '29000', 'Mobi', None))) == ['id_marca__desconhecido']
+
+
+def test_data_invalida_vai_para_a_quarentena():
+    bloco = _bloco(
+        ('2022-13-01', '1', '1', '29000', 'Mobi', 'Fiat'),
+        ('01/02/2022', '1', '1', '29000', 'Mobi', 'Fiat'),
+        ('', '1', '1', '29000', 'Mobi', 'Fiat'),
+    )
+
+    assert _motivos(bloco) == ['data_tipo_invalido', 'data_tipo_invalido', 'data_nulo']
+
+
+def test_marca_divergente_do_id_vai_para_a_quarentena():
+    assert _motivos(_bloco(('2022-01-01', '1', '1', '29000', 'Mobi', 'Kia'))) == ['marca_inconsistente']
+
+
+def test_linha_com_varias_falhas_acumula_os_motivos():
+    assert _motivos(_bloco(('2022-01-01', '1', '-2', '0', 'Mobi', 'Fiat'))) == \
+        ['vendas_fora_do_intervalo;valor_do_veiculo_fora_do_intervalo']
+
+
+def test_quarentena_registra_a_linha_e_o_motivo(tmp_path):
+    caminho = tmp_path / 'dados.csv'
+    caminho.write_text(
+        'data,id_marca_,vendas,valor_do_veiculo,nome,marca\n'
+        '2022-01-01,1,2,29000,Mobi,Fiat\n'
+        '2022-01-01,1,abc,29000,Mobi,Fiat\n'
+        '2022-01-01,2,3,45000,Polo,Volkswagen\n'
+        '2022-01-01,99,1,29000,Mobi,\n',
+        encoding='utf-8')
+
+    dados = carregar_dados_validados(str(caminho), tamanho_bloco=2)
+
+    assert len(dados) == 2
+    assert dados.attrs['linhas_em_quarentena'] == 2
+    assert dados.attrs['caminho_quarentena'] == caminho_quarentena_padrao(str(caminho))
+    quarentena = pd.read_csv(dados.attrs['caminho_quarentena'], dtype=str)
+    assert quarentena['linha'].tolist() == ['1', '3']
+    assert quarentena['vendas'].tolist() == ['abc', '1']
+    assert quarentena['motivo'].tolist() == ['vendas_tipo_invalido', 'id_marca__desconhecido']
+
+
+def test_quarentena_so_e_criada_com_rejeicoes(tmp_path):
+    caminho = tmp_path / 'dados.csv'
+    caminho.write_text('data,id_marca_,vendas,valor_do_veiculo,nome,marca\n'
+                       '2022-01-01,1,2,29000,Mobi,Fiat\n', encoding='utf-8')
+
+    dados = carregar_dados_validados(str(caminho))
+
+    assert dados.attrs['linhas_em_quarentena'] == 0
+    assert not os.path.exists(caminho_quarentena_padrao(str(caminho)))
@@ -0,0 +1,70 @@
+import argparse
+import sys
+
+from relatorios import desempenho
+
+def main():
+    """
+    Função principal para medir os relatórios em dados gerados e comparar com as linhas de base.
+
+    Sai com código 1 se alguma etapa regrediu e com código 2 se faltar a linha de base de algum
+    tamanho. Com --gravar-linha-de-base, grava as medidas atuais como novas linhas de base.
+    """
+    parser = argparse.ArgumentParser(description='Verifica regressões de desempenho dos relatórios.')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=list(desempenho.TAMANHOS_PADRAO),
+                        help='Números de linhas dos conjuntos gerados.')
+    parser.add_argument('--repeticoes', type=int, default=desempenho.REPETICOES_PADRAO,
+                        help='Execuções cronometradas por etapa.')
+    parser.add_argument('--semente', type=int, default=desempenho.SEMENTE_PADRAO, help='Semente dos dados gerados.')
+    parser.add_argument('--etapas', nargs='+', help='Mede apenas estas etapas.')
+    parser.add_argument('--tolerancia-tempo', type=float, default=desempenho.TOLERANCIA_TEMPO_PADRAO,
+                        help='Aumento relativo aceito no tempo mediano (0.5 = 50%%).')
+    parser.add_argument('--tolerancia-memoria', type=float, default=desempenho.TOLERANCIA_MEMORIA_PADRAO,
+                        help='Aumento relativo aceito no pico de memória.')
+    parser.add_argument('--folga-tempo', type=float, default=desempenho.FOLGA_TEMPO_PADRAO,
+                        help='Aumento absoluto de tempo, em segundos, sempre aceito.')
+    parser.add_argument('--folga-memoria', type=int, default=desempenho.FOLGA_MEMORIA_PADRAO,
+                        help='Aumento absoluto do pico de memória, em bytes, sempre aceito.')
+    parser.add_argument('--tentativas', type=int, default=desempenho.TENTATIVAS_PADRAO,
+                        help='Medições de uma etapa que regrediu antes de confirmar a regressão.')
+    parser.add_argument('--diretorio', default=desempenho.DIRETORIO_LINHAS_DE_BASE,
+                        help='Diretório das linhas de base.')
+    parser.add_argument('--gravar-linha-de-base', action='store_true',
+                        help='Grava as medidas atuais como linhas de base em vez de comparar.')
+    argumentos = parser.parse_args()
+
+    codigo_saida = 0
+    for linhas in argumentos.tamanhos:
+        print(f'== {linhas:,} linhas')
+        resultado = desempenho.executar_benchmark(linhas, argumentos.repeticoes, argumentos.semente, argumentos.etapas)
+
+        if argumentos.gravar_linha_de_base:
+            print(f'Linha de base gravada em {desempenho.gravar_linha_de_base(resultado, argumentos.diretorio)}.')
+            continue
+
+        linha_de_base = desempenho.ler_linha_de_base(linhas, argumentos.diretorio)
+        if linha_de_base is None:
+            print(f'Sem linha de base em {desempenho.caminho_linha_de_base(linhas, argumentos.diretorio)}; '
+                  'grave uma com --gravar-linha-de-base.')
+            codigo_saida = max(codigo_saida, 2)
+            continue
+        if linha_de_base['ambiente'] != resultado['ambiente']:
+            print(f"Aviso: linha de base medida em outro ambiente ({linha_de_base['ambiente']}).")
+
+        comparacao = desempenho.confirmar_regressoes(linha_de_base, resultado, argumentos.tentativas,
+                                                     tolerancia_tempo=argumentos.tolerancia_tempo,
+                                                     tolerancia_memoria=argumentos.tolerancia_memoria,
+                                                     folga_tempo=argumentos.folga_tempo,
+                                                     folga_memoria=argumentos.folga_memoria)
+        if argumentos.etapas:
+            comparacao = comparacao[comparacao['etapa'].isin(argumentos.etapas)]
+        print(desempenho.formatar_comparacao(comparacao))
+
+        regressoes = comparacao[comparacao['situacao'] == 'REGRESSAO']
+        if not regressoes.empty:
+            print(f"Regressão em: {', '.join(regressoes['etapa'].unique())}.")
+            codigo_saida = 1
+    sys.exit(codigo_saida)
+
+if __name__ == "__main__":
+    main()